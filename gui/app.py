@@ -46,26 +46,49 @@ from image_processing.enhancing import histEqualization
 from image_processing.enhancing import ahe
 # Thresholding
 from image_processing.thresholding import adaptive_thresholding
-from image_processing.thresholding import simple_thresholding
 from image_processing.thresholding import Binary_OTSU
 # Morphology
 from image_processing.morphology import dilation
 from image_processing.morphology import erosion
 from image_processing.morphology import opening
 from image_processing.morphology import closing
+# Background subtraction
+from image_processing.background import BackgroundModel
 # Advanced
 from image_processing.advanced import perform_color_clustering
+from image_processing.advanced import FrameClusterer
+from image_processing.advanced import quantize_colors
 from image_processing.advanced import laplacian_of_gaussian
 from image_processing.advanced import segment_image
+from image_processing.advanced import watershed_segmentation
+from image_processing.advanced import slic_superpixels
+from image_processing.advanced import colorize_labels
+
+from image_processing.graph import Node
+from image_processing.graph import lazy
+from image_processing.graph import materialize
+from image_processing.graph import brightness
+from image_processing.graph import contrast
+from image_processing.graph import gamma
+from image_processing.graph import threshold
+# Geometry
+from image_processing.geometry import Dihedral
+from image_processing.geometry import rotate
+from image_processing.geometry import deskew
 
 # Import utilities
-from utils.utils import bgr_to_yuv
-from utils.utils import yuv_to_bgr
+from utils.color import apply_to_luma
+from utils.color import apply_to_value
+from utils.precision import to_working
+from utils.precision import quantize
+from utils.roi import process_roi
 
 # Import dialog classes
 from .dialogs import MorphologicalDialog
 from .dialogs import ThresholdDialog
 from .dialogs import FilterDialog
+# Import ROI selection
+from .selection import RoiSelector
 
 # For Image Manipulation
 from pdf2image import convert_from_path
@@ -85,6 +108,54 @@ original_image = None
 changed_image = None
 save_image = None
 cap = None
+image_dpi = None
+# Keep changed_image in float32 between operations (quantized only for display and saving)
+working_precision = True
+# Steps appended to the lazy expression in changed_image instead of being computed right away
+LAZY_STEPS = ('A', 'C', 'D', 'E', 'F')
+# Longest side of the subsampled preview evaluated for display
+PREVIEW_SIZE = 840
+# Rotations and mirrors are kept as a view of geometry_source until another operation needs the pixels
+geometry_source = None
+orientation = Dihedral()
+# Filters, thresholding, LoG and morphology process each colour channel instead of the grayscale image
+per_channel = False
+# Selected region (top, left, bottom, right) in image pixels; None processes the whole image
+selection_roi = None
+
+# Resolution used to rasterize PDF pages
+PDF_DPI = 200
+# Images above this many pixels are segmented tile by tile
+TILED_SEGMENTATION_PIXELS = 4000000
+
+# Working copy of an image in the current precision (8-bit mode truncates, as before)
+def working_copy(image):
+    return to_working(image) if working_precision else np.asarray(image).astype(np.uint8)
+
+# Start a new chain of rotations and mirrors
+def reset_geometry():
+    global geometry_source, orientation
+    geometry_source = None
+    orientation = Dihedral()
+
+# Pixels of a rotated / mirrored view, copied once (contiguous) before a non-geometric operation
+def settle_geometry(image):
+    if geometry_source is None:
+        return image
+    reset_geometry()
+    return np.ascontiguousarray(image)
+
+# Append a step to the lazy expression; with a selection it runs on the selected region only
+def add_step(image, function, halo=None, point=False, scaled=None):
+    if selection_roi is not None:
+        # The selection is bound now, the expression may be evaluated after it changes
+        roi = selection_roi
+        return lazy(image).apply(lambda pixels: process_roi(function, pixels, roi=roi, halo=halo or 0))
+    if point:
+        return lazy(image).point(function)
+    if halo is not None:
+        return lazy(image).neighbourhood(function, halo, scaled)
+    return lazy(image).apply(function)
 
 # ================================= Main Application =================================
 # ====================================================================================
@@ -199,6 +270,9 @@ class DigitalImageProcessingApp(QMainWindow):
             }
         """)
         
+        # Drag on the image to restrict the following operations to a rectangle
+        self.selectors = [RoiSelector(self.panelA, self.set_selection)]
+        
         panel_a_layout.addWidget(original_label)
         panel_a_layout.addWidget(self.panelA)
         panel_a_container.setLayout(panel_a_layout)
@@ -283,7 +357,11 @@ class DigitalImageProcessingApp(QMainWindow):
             "🎨 L) Clustering",
             "✂️ M) Image Segmentation",
             "🔬 N) Morphological Operations",
-            "↩️ O) Revert All Changes"
+            "↩️ O) Revert All Changes",
+            "🎥 P) Background Subtraction",
+            "⚙️ Q) Toggle Working Precision (float32 / 8-bit)",
+            "🌈 R) Toggle Colour Processing (per channel / grayscale)",
+            "📐 S) Rotate by Angle / Deskew"
         ])
         self.combo.setStyleSheet("""
             QComboBox {
@@ -503,6 +581,12 @@ class DigitalImageProcessingApp(QMainWindow):
         self.angle = np.pi / 4
         self.speed = 0.1
         
+        # Clustering state carried across video frames
+        self.frame_clusterer = FrameClusterer(num_clusters=2)
+        
+        # Background model fed with every video frame
+        self.background_model = BackgroundModel('gaussian')
+        
     def setupAnimationTimer(self):
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_panelB)
@@ -546,9 +630,10 @@ class DigitalImageProcessingApp(QMainWindow):
         self.angle += 0.03
         
     def select_image(self):
-        global original_image, changed_image, save_image, cap
+        global original_image, changed_image, save_image, cap, image_dpi
         
         save_image = None
+        image_dpi = None
         
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
@@ -558,20 +643,27 @@ class DigitalImageProcessingApp(QMainWindow):
         )
         
         if file_path:
+            self.clear_selection()
             if cap:
                 cap.release()
+                cap = None
+            self.frame_clusterer.reset()
+            self.background_model.reset()
             
             if file_path.lower().endswith(('.png', '.jpg', '.jpeg')):
                 original_image = cv2.imread(file_path)
                 original_image = cv2.cvtColor(original_image, cv2.COLOR_BGR2RGB)
-                changed_image = original_image.copy()
+                changed_image = working_copy(original_image)
+                reset_geometry()
                 self.display_image(changed_image)
             elif file_path.lower().endswith('.pdf'):
                 try:
-                    images = convert_from_path(file_path)
+                    images = convert_from_path(file_path, dpi=PDF_DPI)
                     if images:
+                        image_dpi = PDF_DPI
                         original_image = np.array(images[0])
-                        changed_image = original_image.copy()
+                        changed_image = working_copy(original_image)
+                        reset_geometry()
                         self.display_image(changed_image)
                     else:
                         QMessageBox.warning(self, "Error", "No images found in the PDF.")
@@ -583,17 +675,23 @@ class DigitalImageProcessingApp(QMainWindow):
                     ret, frame = cap.read()
                     if ret:
                         original_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                        changed_image = original_image.copy()
+                        changed_image = working_copy(original_image)
+                        reset_geometry()
+                        self.background_model.apply(original_image)
                         self.display_image(changed_image)
                 else:
                     QMessageBox.warning(self, "Error", "Error opening file.")
     
     def display_image(self, image, is_processed=False):
+        # Lazy expressions are only evaluated at preview resolution
+        if isinstance(image, Node):
+            image = image.preview(PREVIEW_SIZE)
+        
         # Convert numpy array to QPixmap
         height, width = image.shape[:2]
         
-        # Ensure the image array is contiguous in memory
-        image = np.ascontiguousarray(image)
+        # Quantize working-precision images once, and ensure the array is contiguous in memory
+        image = np.ascontiguousarray(quantize(image))
         
         if len(image.shape) == 3:
             bytes_per_line = 3 * width
@@ -670,6 +768,7 @@ class DigitalImageProcessingApp(QMainWindow):
             layout.setContentsMargins(15, 15, 15, 15)
             self.panelD = QLabel()
             self.panelD.setAlignment(Qt.AlignCenter)
+            self.selectors.append(RoiSelector(self.panelD, self.set_selection))
             layout.addWidget(self.panelD)
             self.after_window.setLayout(layout)
         
@@ -691,8 +790,8 @@ class DigitalImageProcessingApp(QMainWindow):
         # Convert and display image
         height, width = image.shape[:2]
         
-        # Ensure the image array is contiguous in memory
-        image = np.ascontiguousarray(image)
+        # Quantize working-precision images once, and ensure the array is contiguous in memory
+        image = np.ascontiguousarray(quantize(image))
         
         if len(image.shape) == 3:
             bytes_per_line = 3 * width
@@ -711,8 +810,31 @@ class DigitalImageProcessingApp(QMainWindow):
         if hasattr(self, 'panelD') and self.panelD and self.after_window:
             self.update_window_image(processed_image, self.panelD)
     
+    def set_selection(self, fractions):
+        """Store a rubber-band selection (fractions of the displayed image) in image pixels."""
+        global selection_roi
+        
+        if fractions is None or changed_image is None:
+            self.clear_selection()
+            return
+        height, width = changed_image.shape[:2]
+        top, left, bottom, right = fractions
+        selection_roi = (int(round(top * height)), int(round(left * width)),
+                         int(round(bottom * height)), int(round(right * width)))
+        self.setWindowTitle(f"Digital Image Processing Studio - ROI {selection_roi[3] - selection_roi[1]}x{selection_roi[2] - selection_roi[0]}"
+                            f" at ({selection_roi[1]}, {selection_roi[0]})")
+    
+    def clear_selection(self):
+        global selection_roi
+        
+        selection_roi = None
+        for selector in self.selectors:
+            selector.clear()
+        self.setWindowTitle("Digital Image Processing Studio")
+    
     def perform_function(self):
-        global original_image, changed_image, save_image
+        global original_image, changed_image, save_image, working_precision, per_channel
+        global geometry_source, orientation
         
         if original_image is None:
             QMessageBox.warning(self, "No Image Error", "Please select an image to perform function on.")
@@ -754,24 +876,55 @@ class DigitalImageProcessingApp(QMainWindow):
             selection_char = 'N'
         elif "O)" in selection:
             selection_char = 'O'
+        elif "P)" in selection:
+            selection_char = 'P'
+        elif "Q)" in selection:
+            selection_char = 'Q'
+        elif "R)" in selection:
+            selection_char = 'R'
+        elif "S)" in selection:
+            selection_char = 'S'
         else:
             QMessageBox.warning(self, "Invalid Selection", "Please select a valid function.")
             return
         
+        # Point-wise and filter steps stay lazy; every other step needs the pixels
+        if selection_char not in LAZY_STEPS:
+            changed_image = materialize(changed_image)
+        
+        # Rotations and mirrors only compose views; anything else gets the pixels copied once
+        if selection_char not in ('H', 'I', 'J'):
+            changed_image = settle_geometry(changed_image)
+        
+        # Geometric steps move the pixels, so the selection no longer applies
+        if selection_char in ('G', 'H', 'I', 'J', 'S'):
+            self.clear_selection()
+        
         if selection_char == 'A':  # Filters
             dialog = FilterDialog(self)
             if dialog.exec_() == QDialog.Accepted:
                 filter_type = dialog.get_filter_type()
                 kernel_size = dialog.get_kernel_size()
+                # Bound now, the lazy step may be evaluated after the setting is toggled
+                channels = per_channel
                 
                 if filter_type == 'A':
-                    changed_image = apply_averaging_filter(changed_image, kernel_size)
+                    operation = apply_averaging_filter
                 elif filter_type == 'M':
-                    changed_image = apply_median_filter(changed_image, kernel_size)
+                    operation = apply_median_filter
                 else:
-                    changed_image = laplacian_filter(changed_image, kernel_size)
+                    operation = laplacian_filter
+                step = lambda image: operation(image, kernel_size, per_channel=channels)
+                # Previews of the smoothing filters run on the subsampled image with a
+                # proportionally smaller (odd) kernel; the Laplacian's response depends
+                # on the kernel size, so its previews subsample the full result
+                scaled = None
+                if operation is not laplacian_filter:
+                    scaled = lambda factor: lambda image: operation(image, max(1, kernel_size // factor) | 1, per_channel=channels)
                 
-                save_image = copy.deepcopy(changed_image)
+                # Odd kernels keep the image size, so only the needed neighbourhood is computed
+                changed_image = add_step(changed_image, step, kernel_size // 2 if kernel_size % 2 else None, scaled=scaled)
+                save_image = changed_image
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'B':  # Histogram Equalization
@@ -784,24 +937,18 @@ class DigitalImageProcessingApp(QMainWindow):
                     # Check if image is grayscale or color
                     if len(changed_image.shape) == 2:
                         # Grayscale image - apply histogram equalization directly
-                        changed_image = histEqualization(changed_image)
+                        changed_image = histEqualization(changed_image, roi=selection_roi)
                     else:
-                        # Color image - convert to YUV, equalize Y channel, convert back
-                        changed_image = bgr_to_yuv(changed_image)
-                        changed_image[..., 0] = histEqualization(changed_image[..., 0])
-                        changed_image = yuv_to_bgr(changed_image)
+                        # Color image - equalize the luma plane only, chroma is kept as is
+                        changed_image = process_roi(apply_to_luma, changed_image, histEqualization, roi=selection_roi)
                 elif method.lower() == 'adaptive':
                     # Check if image is grayscale or color
                     if len(changed_image.shape) == 2:
                         # Grayscale image - apply adaptive histogram equalization directly
-                        changed_image = ahe(changed_image)
+                        changed_image = ahe(changed_image, roi=selection_roi)
                     else:
-                        # Color image - use HSV color space
-                        hsv = cv2.cvtColor(changed_image, cv2.COLOR_RGB2HSV)
-                        h, s, v = cv2.split(hsv)
-                        ahe_v = ahe(v)
-                        merged_ahe = cv2.merge((h, s, ahe_v))
-                        changed_image = cv2.cvtColor(merged_ahe, cv2.COLOR_HSV2RGB)
+                        # Color image - equalize the HSV value plane, hue and saturation are kept
+                        changed_image = process_roi(apply_to_value, changed_image, ahe, roi=selection_roi)
                 
                 save_image = copy.deepcopy(changed_image)
                 self.display_image(changed_image, is_processed=True)
@@ -811,18 +958,19 @@ class DigitalImageProcessingApp(QMainWindow):
             if dialog.exec_() == QDialog.Accepted:
                 threshold_type = dialog.get_threshold_type()
                 threshold_value = dialog.get_threshold_value()
+                channels = per_channel
                 
                 if threshold_type == 'BO':
-                    changed_image = Binary_OTSU(changed_image)
+                    changed_image = add_step(changed_image, lambda image: Binary_OTSU(image, per_channel=channels))
                 elif threshold_type == 'AT':
-                    changed_image = adaptive_thresholding(changed_image, 3, 2)
+                    changed_image = add_step(changed_image, lambda image: adaptive_thresholding(image, per_channel=channels), 1)
                 elif threshold_type == 'SV':
                     if not (0 <= threshold_value <= 255):
                         QMessageBox.warning(self, "Invalid Threshold", "Please enter a value between 0-255.")
                         return
-                    changed_image = simple_thresholding(changed_image, threshold_value)
+                    changed_image = add_step(changed_image, threshold(threshold_value), point=True)
                 
-                save_image = copy.deepcopy(changed_image)
+                save_image = changed_image
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'D':  # Brightness
@@ -830,8 +978,8 @@ class DigitalImageProcessingApp(QMainWindow):
             value, ok = QInputDialog.getInt(self, "Brightness", "Enter brightness value to add/subtract:", 0, -255, 255)
             
             if ok:
-                changed_image = np.clip(changed_image.astype(np.float32) + value, 0, 255).astype(np.uint8)
-                save_image = copy.deepcopy(changed_image)
+                changed_image = add_step(changed_image, brightness(value), point=True)
+                save_image = changed_image
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'E':  # Contrast (multiplication)
@@ -839,8 +987,8 @@ class DigitalImageProcessingApp(QMainWindow):
             value, ok = QInputDialog.getDouble(self, "Contrast", "Enter contrast multiplier:", 1.0, 0.1, 10.0, 2)
             
             if ok:
-                changed_image = np.clip(changed_image.astype(np.float32) * value, 0, 255).astype(np.uint8)
-                save_image = copy.deepcopy(changed_image)
+                changed_image = add_step(changed_image, contrast(value), point=True)
+                save_image = changed_image
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'F':  # Contrast (power)
@@ -848,8 +996,8 @@ class DigitalImageProcessingApp(QMainWindow):
             power, ok = QInputDialog.getDouble(self, "Contrast Power", "Enter power value:", 1.0, 0.1, 5.0, 2)
             
             if ok:
-                changed_image = np.array(255 * (changed_image / 255) ** power, dtype='uint8')
-                save_image = copy.deepcopy(changed_image)
+                changed_image = add_step(changed_image, gamma(power), point=True)
+                save_image = changed_image
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'G':  # Resize
@@ -862,35 +1010,65 @@ class DigitalImageProcessingApp(QMainWindow):
                     save_image = copy.deepcopy(changed_image)
                     self.display_image(changed_image, is_processed=True)
         
-        elif selection_char == 'H':  # Rotate
-            changed_image = np.transpose(changed_image, (1, 0, 2))[:, ::-1]
-            save_image = copy.deepcopy(changed_image)
-            self.display_image(changed_image, is_processed=True)
-        
-        elif selection_char == 'I':  # Horizontal flip
-            changed_image = np.flip(changed_image, axis=1)
-            save_image = copy.deepcopy(changed_image)
-            self.display_image(changed_image, is_processed=True)
-        
-        elif selection_char == 'J':  # Vertical flip
-            changed_image = np.flipud(changed_image)
-            save_image = copy.deepcopy(changed_image)
+        elif selection_char in ('H', 'I', 'J'):  # Rotate, horizontal flip, vertical flip
+            if geometry_source is None:
+                geometry_source = changed_image
+            if selection_char == 'H':
+                orientation = orientation.rotate90()
+            elif selection_char == 'I':
+                orientation = orientation.flip_horizontal()
+            else:
+                orientation = orientation.flip_vertical()
+            # A view of the untransformed image; nothing is copied until it is displayed, saved or processed
+            changed_image = orientation.apply(geometry_source)
+            save_image = changed_image
             self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'K':  # Laplacian of Gaussian
-            changed_image = laplacian_of_gaussian(changed_image, 3)
+            changed_image = laplacian_of_gaussian(changed_image, 3, roi=selection_roi, per_channel=per_channel)
             save_image = copy.deepcopy(changed_image)
             self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'L':  # Clustering
-            changed_image = perform_color_clustering(changed_image, num_clusters=2)
-            save_image = copy.deepcopy(changed_image)
-            self.display_image(changed_image, is_processed=True)
+            methods = ["K-means", "Median Cut", "Octree"]
+            method, ok1 = QInputDialog.getItem(self, "Clustering", "Select algorithm:", methods, 0, False)
+            if ok1:
+                num_colors, ok2 = QInputDialog.getInt(self, "Clustering", "Enter number of colours:", 2, 2, 256)
+                if ok2:
+                    if method.lower() == 'k-means':
+                        if cap is not None:
+                            # Video: warm-start from the previous frame's palette
+                            if self.frame_clusterer.num_clusters != num_colors:
+                                self.frame_clusterer = FrameClusterer(num_clusters=num_colors)
+                            changed_image = process_roi(lambda image: self.frame_clusterer.partial_fit(image).quantize(image),
+                                                        changed_image, roi=selection_roi)
+                        else:
+                            changed_image = perform_color_clustering(changed_image, num_clusters=num_colors, roi=selection_roi)
+                    else:
+                        changed_image = quantize_colors(changed_image, num_colors, method, roi=selection_roi)
+                    
+                    save_image = copy.deepcopy(changed_image)
+                    self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'M':  # Segmentation
-            changed_image = segment_image(changed_image)
-            save_image = copy.deepcopy(changed_image)
-            self.display_image(changed_image, is_processed=True)
+            methods = ["Edges", "Watershed", "Superpixels"]
+            method, ok = QInputDialog.getItem(self, "Image Segmentation", "Select method:", methods, 0, False)
+            
+            if ok:
+                if method.lower() == 'edges':
+                    # Large scans are processed in tiles; the area filter follows the resolution
+                    large = changed_image.shape[0] * changed_image.shape[1] > TILED_SEGMENTATION_PIXELS
+                    changed_image = segment_image(changed_image, dpi=image_dpi, tile_size=1024 if large else None, roi=selection_roi)
+                elif method.lower() == 'watershed':
+                    # Label touching objects, then paint each label with its mean colour
+                    changed_image = process_roi(lambda image: colorize_labels(watershed_segmentation(image), image),
+                                                changed_image, roi=selection_roi)
+                elif method.lower() == 'superpixels':
+                    changed_image = process_roi(lambda image: colorize_labels(slic_superpixels(image), image),
+                                                changed_image, roi=selection_roi)
+                
+                save_image = copy.deepcopy(changed_image)
+                self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'N':  # Morphological Operations
             dialog = MorphologicalDialog(self)
@@ -899,26 +1077,71 @@ class DigitalImageProcessingApp(QMainWindow):
                 structuring_element = dialog.get_structuring_element()
                 
                 if operation_type == 'erosion':
-                    changed_image = erosion(changed_image, structuring_element)
+                    changed_image = erosion(changed_image, structuring_element, roi=selection_roi, per_channel=per_channel)
                 elif operation_type == 'dilation':
-                    changed_image = dilation(changed_image, structuring_element)
+                    changed_image = dilation(changed_image, structuring_element, roi=selection_roi, per_channel=per_channel)
                 elif operation_type == 'opening':
-                    changed_image = opening(changed_image, structuring_element)
+                    changed_image = opening(changed_image, structuring_element, roi=selection_roi, per_channel=per_channel)
                 elif operation_type == 'closing':
-                    changed_image = closing(changed_image, structuring_element)
+                    changed_image = closing(changed_image, structuring_element, roi=selection_roi, per_channel=per_channel)
                 
                 save_image = copy.deepcopy(changed_image)
                 self.display_image(changed_image, is_processed=True)
         
         elif selection_char == 'O':  # Revert
-            changed_image = original_image.copy()
+            changed_image = working_copy(original_image)
+            save_image = copy.deepcopy(changed_image)
+            self.display_image(changed_image, is_processed=True)
+        
+        elif selection_char == 'P':  # Background subtraction
+            if cap is None or self.background_model.foreground is None:
+                QMessageBox.warning(self, "No Video Error", "Please load a video and step through some frames first.")
+                return
+            # Foreground mask of the latest frame fed to the model
+            changed_image = working_copy(self.background_model.foreground)
             save_image = copy.deepcopy(changed_image)
             self.display_image(changed_image, is_processed=True)
+        
+        elif selection_char == 'Q':  # Working precision
+            working_precision = not working_precision
+            changed_image = working_copy(quantize(changed_image) if not working_precision else changed_image)
+            save_image = copy.deepcopy(changed_image)
+            QMessageBox.information(self, "Working Precision",
+                                    "Operations now keep float32 precision between steps." if working_precision
+                                    else "Operations now quantize to 8 bits after every step.")
+            self.display_image(changed_image, is_processed=True)
+        
+        elif selection_char == 'S':  # Arbitrary rotation / deskew
+            methods = ["Angle", "Deskew"]
+            method, ok1 = QInputDialog.getItem(self, "Rotate", "Select method:", methods, 0, False)
+            if ok1:
+                interpolations = ["Bilinear", "Bicubic", "Nearest"]
+                interpolation, ok2 = QInputDialog.getItem(self, "Rotate", "Select interpolation:", interpolations, 0, False)
+                if ok2:
+                    if method.lower() == 'angle':
+                        angle, ok3 = QInputDialog.getDouble(self, "Rotate", "Enter angle in degrees (counter-clockwise):", 0.0, -360.0, 360.0, 2)
+                        if not ok3:
+                            return
+                        changed_image = rotate(changed_image, angle, interpolation.lower(), expand=True)
+                    else:
+                        # Dominant text / line angle of the page, corners filled with white
+                        changed_image, angle = deskew(changed_image, interpolation.lower())
+                    save_image = copy.deepcopy(changed_image)
+                    self.display_image(changed_image, is_processed=True)
+                    if method.lower() == 'deskew':
+                        QMessageBox.information(self, "Deskew", f"Detected skew: {angle:.2f} degrees")
+        
+        elif selection_char == 'R':  # Colour processing
+            per_channel = not per_channel
+            QMessageBox.information(self, "Colour Processing",
+                                    "Filters, thresholding, LoG and morphology now process each colour channel." if per_channel
+                                    else "Filters, thresholding, LoG and morphology now work on the grayscale image.")
     
     def save_image_function(self):
         global save_image
         
         if save_image is not None:
+            image = np.ascontiguousarray(quantize(materialize(save_image)))
             file_path, _ = QFileDialog.getSaveFileName(
                 self,
                 "Save Image",
@@ -927,13 +1150,13 @@ class DigitalImageProcessingApp(QMainWindow):
             )
             if file_path:
                 # Handle both grayscale and color images
-                if len(save_image.shape) == 3:
+                if len(image.shape) == 3:
                     # Convert RGB back to BGR for OpenCV
-                    save_image_bgr = cv2.cvtColor(save_image, cv2.COLOR_RGB2BGR)
+                    save_image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
                     cv2.imwrite(file_path, save_image_bgr)
                 else:
                     # Grayscale image - save directly
-                    cv2.imwrite(file_path, save_image)
+                    cv2.imwrite(file_path, image)
         else:
             QMessageBox.warning(self, "No Modified Image", "Please select an image and perform operation before saving.")
     
@@ -944,7 +1167,9 @@ class DigitalImageProcessingApp(QMainWindow):
             ret, frame = cap.read()
             if ret:
                 original_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                changed_image = original_image.copy()
+                changed_image = working_copy(original_image)
+                reset_geometry()
+                self.background_model.apply(original_image)
                 self.display_image(changed_image, is_processed=False)
     
     def prev_frame(self):
@@ -957,5 +1182,6 @@ class DigitalImageProcessingApp(QMainWindow):
                 ret, frame = cap.read() 
                 if ret:
                     original_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    changed_image = original_image.copy()
+                    changed_image = working_copy(original_image)
+                    reset_geometry()
                     self.display_image(changed_image, is_processed=False)
@@ -0,0 +1,86 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# ==== PyQt Modules ==== #
+# PyQt Widgets
+from PyQt5.QtWidgets import QRubberBand
+# PyQt Core
+from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QEvent
+from PyQt5.QtCore import QPoint
+from PyQt5.QtCore import QRect
+from PyQt5.QtCore import QSize
+from PyQt5.QtCore import Qt
+
+# ================================= ROI Selection ===================================
+# ===================================================================================
+
+# Drags shorter than this (in screen pixels) count as a click, which clears the selection
+MIN_DRAG = 4
+
+
+# Rubber-band rectangle selection on an image panel (a centred QLabel pixmap)
+class RoiSelector(QObject):
+    def __init__(self, label, on_select):
+        """
+        Args:
+            label (QLabel): Panel showing the image
+            on_select: Called with (top, left, bottom, right) as fractions of the
+                displayed image, or None when the selection is cleared
+        """
+        super().__init__(label)
+        self.label = label
+        self.on_select = on_select
+        self.origin = None
+        self.rubber_band = QRubberBand(QRubberBand.Rectangle, label)
+        label.installEventFilter(self)
+
+    def clear(self):
+        self.rubber_band.hide()
+
+    def _pixmap_rect(self):
+        """Where the (centred) pixmap is drawn inside the label."""
+        pixmap = self.label.pixmap()
+        if pixmap is None or pixmap.isNull():
+            return None
+        rect = QRect(QPoint(0, 0), pixmap.size())
+        rect.moveCenter(self.label.contentsRect().center())
+        return rect
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self.origin = event.pos()
+            self.rubber_band.setGeometry(QRect(self.origin, QSize()))
+            self.rubber_band.show()
+        elif event.type() == QEvent.MouseMove and self.origin is not None:
+            self.rubber_band.setGeometry(QRect(self.origin, event.pos()).normalized())
+        elif event.type() == QEvent.MouseButtonRelease and self.origin is not None:
+            self.origin = None
+            pixmap_rect = self._pixmap_rect()
+            rect = self.rubber_band.geometry()
+            if pixmap_rect is None or rect.width() < MIN_DRAG or rect.height() < MIN_DRAG:
+                self.rubber_band.hide()
+                self.on_select(None)
+                return False
+            rect = rect.intersected(pixmap_rect)
+            self.rubber_band.setGeometry(rect)
+            height, width = pixmap_rect.height(), pixmap_rect.width()
+            self.on_select(((rect.top() - pixmap_rect.top()) / height,
+                            (rect.left() - pixmap_rect.left()) / width,
+                            (rect.bottom() + 1 - pixmap_rect.top()) / height,
+                            (rect.right() + 1 - pixmap_rect.left()) / width))
+        return False
@@ -17,12 +17,37 @@
 
 # Import utilities
 from utils.utils import convolve
+from utils.color import to_gray
+from utils.precision import WORKING_DTYPE
+from utils.precision import working_dtype
+from utils.precision import is_float
+from utils.precision import quantize
+from utils.roi import supports_roi
+from utils.batch import supports_batch
+from utils.channels import supports_channels
+from utils.channels import to_planes
+from utils.channels import from_planes
+
+# Morphology
+from image_processing.morphology import remove_small_objects
+from image_processing.morphology import merge_equivalences
+from image_processing.morphology import label_components
+from image_processing.morphology import grey_dilation
+from image_processing.morphology import grey_erosion
+from image_processing.morphology import fill_holes
+from image_processing.morphology import h_maxima
+# Thresholding
+from image_processing.thresholding import otsu_threshold
+# Gradients
+from image_processing.gradient import canny
 
 # For Image Manipulation
 import cv2
 
 # Other Necessary Libraries
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import os
 
 # =============================== Advanced Algorithms ===============================
 # ===================================================================================
@@ -44,17 +69,13 @@ def laplacian_kernel():
                      [1, -4, 1],
                      [0, 1, 0]])
 
-def laplacian_of_gaussian(image, kernel_size):
-    image = np.array(image)
-    image = image[:, :, :3]
-    
-    # Convert to grayscale
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
+@supports_batch(vectorized=True)
+@supports_roi(lambda kernel_size, *_, **__: (kernel_size | 1) // 2 + 1)
+@supports_channels
+def laplacian_of_gaussian(image, kernel_size, per_channel=False, batch=False):
+    # Convert to grayscale (memoized per image buffer), or keep the colour planes; float input stays float32
+    dtype = working_dtype(image)
+    planes = to_planes(image, dtype, per_channel, batch)
     
     # Ensure kernel size is odd to have a central pixel
     if kernel_size % 2 == 0:
@@ -64,39 +85,129 @@ def laplacian_of_gaussian(image, kernel_size):
     
     # Step 1: Apply Gaussian blur
     gaussian = gaussian_kernel(kernel_size, sigma)
-    blurred_image = convolve(image, gaussian)
+    blurred_image = convolve(planes, gaussian)
     
     # Step 2: Apply Laplacian filter
     laplacian = laplacian_kernel()
     log_image = convolve(blurred_image, laplacian)
     
-    return log_image.astype(np.uint8)
+    return from_planes(log_image.astype(dtype), image, per_channel, batch=batch)
 
 
 ########################################################## Colour Clustering (Using K-means)
-def initialize_centroids(pixels, k):
-    indices = np.random.choice(pixels.shape[0], k, replace=False)
-    return pixels[indices]
+def initialize_centroids(pixels, k, rng=None, sample_size=100000, weights=None):
+    """k-means++ seeding on a random sample of at most `sample_size` (optionally weighted) pixels."""
+    rng = np.random.default_rng(rng)
+    weights = np.ones(pixels.shape[0]) if weights is None else np.asarray(weights, dtype=np.float64)
+    if pixels.shape[0] > sample_size:
+        sample = rng.choice(pixels.shape[0], sample_size, replace=False)
+        pixels, weights = pixels[sample], weights[sample]
+    pixels = pixels.astype(np.float32)
 
-def assign_clusters(pixels, centroids):
-    distances = np.linalg.norm(pixels[:, np.newaxis] - centroids, axis=2)
-    return np.argmin(distances, axis=1)
+    centroids = [pixels[rng.choice(pixels.shape[0], p=weights / weights.sum())]]
+    closest = np.sum((pixels - centroids[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        # Next centroid drawn with probability proportional to the (weighted) squared distance
+        score = weights * closest
+        total = score.sum()
+        index = rng.choice(pixels.shape[0], p=score / total) if total > 0 else rng.integers(pixels.shape[0])
+        centroids.append(pixels[index])
+        np.minimum(closest, np.sum((pixels - pixels[index]) ** 2, axis=1), out=closest)
+    return np.array(centroids, dtype=np.float32)
 
-def recalculate_centroids(pixels, labels, k):
-    centroids = np.array([pixels[labels == i].mean(axis=0) if np.any(labels == i) else pixels[np.random.choice(pixels.shape[0])] for i in range(k)])
+def assign_clusters(pixels, centroids, chunk_size=65536):
+    """Nearest centroid per pixel, in float32 chunks using |x|^2 - 2x.c + |c|^2."""
+    centroids = centroids.astype(np.float32)
+    centroid_norms = np.sum(centroids ** 2, axis=1)
+    labels = np.empty(pixels.shape[0], dtype=np.intp)
+    for start in range(0, pixels.shape[0], chunk_size):
+        chunk = pixels[start:start + chunk_size].astype(np.float32)
+        # |x|^2 is the same for every centroid, so it does not change the argmin
+        distances = centroid_norms - 2 * (chunk @ centroids.T)
+        labels[start:start + chunk_size] = np.argmin(distances, axis=1)
+    return labels
+
+def recalculate_centroids(pixels, labels, k, rng=None, weights=None):
+    """(Weighted) cluster means from one bincount per channel; empty clusters are re-seeded randomly."""
+    rng = np.random.default_rng(rng)
+    counts = np.bincount(labels, weights=weights, minlength=k)
+    weighted = pixels if weights is None else pixels * np.asarray(weights)[:, None]
+    sums = np.stack([np.bincount(labels, weights=weighted[:, c], minlength=k) for c in range(pixels.shape[1])], axis=1)
+    centroids = (sums / np.where(counts > 0, counts, 1)[:, None]).astype(np.float32)
+    empty = counts == 0
+    if empty.any():
+        centroids[empty] = pixels[rng.choice(pixels.shape[0], empty.sum())]
     return centroids
 
-def k_means(pixels, k=4, max_iters=100):
-    centroids = initialize_centroids(pixels, k)
-    for _ in range(max_iters):
-        labels = assign_clusters(pixels, centroids)
-        new_centroids = recalculate_centroids(pixels, labels, k)
-        if np.allclose(centroids, new_centroids, atol=1e-4):
-            break
-        centroids = new_centroids
+def k_means(pixels, k=4, max_iters=100, batch_size=None, random_state=None, tol=1e-4, weights=None, init=None):
+    """
+    K-means with k-means++ seeding (or `init` centroids) and optional per-sample weights.
+
+    With `batch_size` set, centroids are updated from random mini-batches
+    (per-centroid learning rate 1 / count, as in Sculley's mini-batch k-means)
+    for `max_iters` batches; otherwise full Lloyd iterations are run.
+    Weighted samples are drawn into mini-batches in proportion to their weight.
+    """
+    rng = np.random.default_rng(random_state)
+    if init is None:
+        centroids = initialize_centroids(pixels, k, rng, weights=weights)
+    else:
+        centroids = np.array(init, dtype=np.float32)
+
+    if batch_size is None:
+        for _ in range(max_iters):
+            labels = assign_clusters(pixels, centroids)
+            new_centroids = recalculate_centroids(pixels, labels, k, rng, weights)
+            if np.allclose(centroids, new_centroids, atol=tol):
+                break
+            centroids = new_centroids
+    else:
+        probabilities = None if weights is None else np.asarray(weights, dtype=np.float64) / np.sum(weights)
+        seen = np.zeros(k, dtype=np.float64)
+        for _ in range(max_iters):
+            batch = pixels[rng.choice(pixels.shape[0], size=batch_size, p=probabilities)].astype(np.float32)
+            batch_labels = assign_clusters(batch, centroids)
+
+            # Aggregate the per-sample updates of the batch with bincount
+            counts = np.bincount(batch_labels, minlength=k)
+            sums = np.stack([np.bincount(batch_labels, weights=batch[:, c], minlength=k) for c in range(batch.shape[1])], axis=1)
+            seen += counts
+            hit = counts > 0
+            step = (sums[hit] - counts[hit, None] * centroids[hit]) / seen[hit, None]
+            centroids[hit] += step.astype(np.float32)
+            if np.abs(step).max(initial=0) < tol:
+                break
+
+    labels = assign_clusters(pixels, centroids)
     return centroids, labels
 
-def perform_color_clustering(image, num_clusters = 4):
+def color_histogram(pixels, bits=5):
+    """
+    Quantize RGB pixels into a 3-D histogram with `bits` bits per channel.
+
+    Returns the bin code of every pixel, the codes of the occupied bins,
+    their pixel counts and the mean colour of each occupied bin.
+    """
+    shift = 8 - bits
+    q = (pixels >> shift).astype(np.int32)
+    codes = (q[:, 0] << (2 * bits)) | (q[:, 1] << bits) | q[:, 2]
+
+    counts = np.bincount(codes, minlength=1 << (3 * bits))
+    occupied = np.flatnonzero(counts)
+    means = np.stack([np.bincount(codes, weights=pixels[:, c], minlength=counts.size)[occupied]
+                      for c in range(3)], axis=1) / counts[occupied, None]
+    return codes, occupied, counts[occupied], means.astype(np.float32)
+
+def _palette(colors, image):
+    """Palette in the image's working dtype: rounded uint8, or unrounded float32 for float images."""
+    if is_float(image):
+        return np.asarray(colors, dtype=WORKING_DTYPE)
+    return np.clip(np.rint(colors), 0, 255).astype(np.uint8)
+
+@supports_batch()
+@supports_roi()
+def perform_color_clustering(image, num_clusters = 4, max_iters = 100, batch_size = 4096, random_state = None,
+                             mode = 'pixels', bits = 5):
     # Load the image
     img_data = np.array(image)
     img_data = img_data[:, :, :3]
@@ -104,54 +215,334 @@ def perform_color_clustering(image, num_clusters = 4):
     # Reshape the image data into a two-dimensional array
     pixels = img_data.reshape(-1, 3)
 
-    # Apply k-means clustering
-    centroids, labels = k_means(pixels, k=num_clusters)
-    new_colors = centroids[labels].astype(np.uint8)
+    if mode == 'histogram':
+        # Weighted k-means over the occupied colour bins only
+        codes, occupied, counts, bin_colors = color_histogram(quantize(pixels), bits)
+        centroids, bin_labels = k_means(bin_colors, k=min(num_clusters, occupied.size), max_iters=max_iters,
+                                        random_state=random_state, weights=counts)
+
+        # Map every pixel back through the bin -> label LUT
+        lut = np.zeros(1 << (3 * bits), dtype=np.intp)
+        lut[occupied] = bin_labels
+        labels = lut[codes]
+    elif mode == 'pixels':
+        # Apply (mini-batch) k-means clustering
+        centroids, labels = k_means(pixels, k=num_clusters, max_iters=max_iters, batch_size=batch_size, random_state=random_state)
+    else:
+        raise ValueError("Invalid mode. Supported modes are: 'pixels', 'histogram'.")
+
+    new_colors = _palette(centroids, img_data)[labels]
 
     # Reshape back to the original image shape
     new_image_data = new_colors.reshape(img_data.shape)
 
-    return new_image_data.astype(np.uint8)
+    return new_image_data
+
+
+class FrameClusterer:
+    """
+    Colour clustering for a stream of video frames with warm starts.
+
+    Each frame is clustered starting from the previous frame's centroids, so
+    consecutive similar frames converge in a few Lloyd iterations and the
+    palette stays stable instead of flickering. Only the first frame (or the
+    first one after `reset`) is seeded with k-means++.
+
+    Usage:
+        clusterer = FrameClusterer(num_clusters=4)
+        for frame in frames:
+            quantized = clusterer.partial_fit(frame).quantize(frame)
+    """
+
+    def __init__(self, num_clusters=4, max_iters=100, tol=0.5, sample_size=65536, random_state=None):
+        self.num_clusters = num_clusters
+        self.max_iters = max_iters
+        self.tol = tol
+        self.sample_size = sample_size
+        self.rng = np.random.default_rng(random_state)
+        self.centroids = None
+
+    def reset(self):
+        """Forget the previous centroids (e.g. on a scene cut or a new video)."""
+        self.centroids = None
+        return self
+
+    def partial_fit(self, frame):
+        """Update the centroids with one frame, warm-started from the previous ones."""
+        pixels = np.asarray(frame)[..., :3].reshape(-1, 3)
+
+        # Fit on a random subset; the full frame is only needed to assign labels
+        if pixels.shape[0] > self.sample_size:
+            pixels = pixels[self.rng.choice(pixels.shape[0], self.sample_size, replace=False)]
+        self.centroids, _ = k_means(pixels, k=self.num_clusters, max_iters=self.max_iters,
+                                    random_state=self.rng, tol=self.tol, init=self.centroids)
+        return self
+
+    def predict(self, frame):
+        """Cluster label of every pixel of a frame, as a (height, width) array."""
+        if self.centroids is None:
+            raise ValueError("FrameClusterer has not been fitted yet; call partial_fit first.")
+        frame = np.asarray(frame)
+        return assign_clusters(frame[..., :3].reshape(-1, 3), self.centroids).reshape(frame.shape[:2])
+
+    def quantize(self, frame):
+        """Replace every pixel of a frame by its centroid colour."""
+        return _palette(self.centroids, frame)[self.predict(frame)]
+
+
+########################################################## Colour Quantization (Median Cut & Octree)
+def build_palette_lut(palette, bits=5):
+    """
+    Nearest palette entry for every cell of a 3-D colour grid with `bits` bits per channel.
+
+    Pixels are then mapped with a single lookup of their histogram bin code.
+    """
+    levels = 1 << bits
+    centres = (np.arange(levels) << (8 - bits)) + (1 << (8 - bits)) / 2 - 0.5
+    r, g, b = np.meshgrid(centres, centres, centres, indexing='ij')
+    grid = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+    return assign_clusters(grid, np.asarray(palette, dtype=np.float32))
+
+def median_cut_palette(pixels, num_colors=16, bits=5):
+    """
+    Median-cut palette built from the colour histogram.
+
+    The box with the widest channel range (weighted by its pixel count) is
+    split at the weighted median of that channel until there are
+    `num_colors` boxes; each palette colour is the weighted mean of a box.
+    """
+    _, _, counts, colors = color_histogram(pixels, bits)
+    boxes = [np.arange(colors.shape[0])]
+    while len(boxes) < num_colors:
+        # Pick the box with the largest (range x population) that can still be split
+        scores = [np.ptp(colors[box], axis=0).max() * counts[box].sum() if box.size > 1 else -1 for box in boxes]
+        index = int(np.argmax(scores))
+        if scores[index] <= 0:
+            break
+        box = boxes.pop(index)
+
+        channel = np.argmax(np.ptp(colors[box], axis=0))
+        order = box[np.argsort(colors[box, channel], kind='stable')]
+        cumulative = np.cumsum(counts[order])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), order.size - 1)
+        boxes += [order[:split], order[split:]]
+
+    return np.array([np.average(colors[box], axis=0, weights=counts[box]) for box in boxes], dtype=np.float32)
+
+def octree_palette(pixels, num_colors=16, bits=5):
+    """
+    Octree palette built from the colour histogram.
+
+    A node at depth d holds every colour sharing the top d bits of each
+    channel. Starting from the deepest level with at most `num_colors`
+    nodes, the most populated nodes are split into their children while the
+    leaf count stays within `num_colors` (equivalent to reducing the least
+    populated nodes of a full octree). Each leaf contributes the weighted
+    mean colour of its pixels.
+    """
+    _, _, counts, colors = color_histogram(pixels, bits)
+    quantized = colors.astype(np.int32) >> (8 - bits)
+
+    def node_ids(depth):
+        q = quantized >> (bits - depth)
+        return (q[:, 0] << (2 * depth)) | (q[:, 1] << depth) | q[:, 2]
+
+    # Deepest level whose node count fits the palette
+    depth = 0
+    while depth < bits and np.unique(node_ids(depth + 1)).size <= num_colors:
+        depth += 1
+    _, leaves = np.unique(node_ids(depth), return_inverse=True)
+
+    if depth < bits:
+        # Split the most populated nodes one level down while the budget allows
+        _, children = np.unique(node_ids(depth + 1), return_inverse=True)
+        node_counts = np.bincount(leaves, weights=counts)
+        child_counts = np.bincount(np.unique(np.stack([leaves, children], axis=1), axis=0)[:, 0], minlength=node_counts.size)
+        budget = num_colors - node_counts.size
+        split = np.zeros(node_counts.size, dtype=bool)
+        for node in np.argsort(-node_counts, kind='stable'):
+            if child_counts[node] - 1 <= budget:
+                split[node] = True
+                budget -= child_counts[node] - 1
+        leaves = np.where(split[leaves], children + leaves.max() + 1, leaves)
+        _, leaves = np.unique(leaves, return_inverse=True)
+
+    weight = np.bincount(leaves, weights=counts)
+    return np.stack([np.bincount(leaves, weights=colors[:, c] * counts) / weight for c in range(3)],
+                    axis=1).astype(np.float32)
+
+@supports_batch()
+@supports_roi()
+def quantize_colors(image, num_colors=16, method='median_cut', bits=5):
+    """Reduce an image to `num_colors` colours with the median-cut or octree quantizer."""
+    img_data = np.array(image)
+    img_data = img_data[:, :, :3]
+    # Colour codes index 8-bit bins, so float images are binned on their quantized values
+    pixels = quantize(img_data).reshape(-1, 3)
+
+    method = method.lower().replace('-', '_').replace(' ', '_')
+    if method == 'median_cut':
+        palette = median_cut_palette(pixels, num_colors, bits)
+    elif method == 'octree':
+        palette = octree_palette(pixels, num_colors, bits)
+    else:
+        raise ValueError("Invalid method. Supported methods are: 'median_cut', 'octree'.")
+
+    # Map every pixel through the precomputed 3-D nearest-palette LUT
+    lut = build_palette_lut(palette, bits)
+    codes = color_histogram(pixels, bits)[0]
+    return _palette(palette, img_data)[lut[codes]].reshape(img_data.shape)
 
 
 ########################################################## Image Segmentation (generic)
-def segment_image(image):
+# Minimum object area of segment_image at the reference resolution
+MIN_OBJECT_AREA = 1000
+REFERENCE_DPI = 96
+REFERENCE_PIXELS = 1024 * 768
+
+def scaled_min_area(shape, dpi=None, min_area=MIN_OBJECT_AREA):
+    """
+    Scale the minimum object area with the image resolution.
+
+    With a known DPI the area grows with (dpi / REFERENCE_DPI)^2; otherwise it
+    grows with the pixel count relative to REFERENCE_PIXELS. Images at or
+    below the reference keep `min_area`.
+    """
+    if dpi is not None:
+        return min_area * max(dpi / REFERENCE_DPI, 1) ** 2
+    return min_area * max(shape[0] * shape[1] / REFERENCE_PIXELS, 1)
+
+def _edge_mask(gray_image, low_threshold, high_threshold, kernel):
+    """Blur, Canny and closing; the result has the size of the blurred (valid) image."""
+    gaussian_k = gaussian_kernel(5, 1.0)
+    blurred_image = convolve(gray_image, gaussian_k)
+    edges = canny(blurred_image, low_threshold, high_threshold)
+    edges = cv2.dilate(edges, kernel, iterations=1)
+    edges = cv2.erode(edges, kernel, iterations=1)
+    return edges
+
+def _tiles(shape, tile_size):
+    """(y0, y1, x0, x1) of the tiles covering an image."""
+    return [(y, min(y + tile_size, shape[0]), x, min(x + tile_size, shape[1]))
+            for y in range(0, shape[0], tile_size) for x in range(0, shape[1], tile_size)]
+
+def _label_tiled(mask, tiles, connectivity, pool):
+    """
+    Label a binary mask tile by tile, then merge labels across tile seams.
+
+    Every tile is labelled independently in the pool; local labels are
+    offset into one global range and the labels of touching pixels on both
+    sides of every seam are declared equivalent and merged with union-find.
+    """
+    local = list(pool.map(lambda t: label_components(mask[t[0]:t[1], t[2]:t[3]], connectivity), tiles))
+
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    offset = 0
+    for (y0, y1, x0, x1), (tile_labels, count) in zip(tiles, local):
+        labels[y0:y1, x0:x1] = np.where(tile_labels > 0, tile_labels + offset, 0)
+        offset += count
+
+    # Equivalences across the seams
+    first, second = [], []
+    seams_y = sorted({t[0] for t in tiles} - {0})
+    seams_x = sorted({t[2] for t in tiles} - {0})
+    for lines, seams in ((labels, seams_y), (labels.T, seams_x)):
+        for seam in seams:
+            a, b = lines[seam - 1], lines[seam]
+            pairs = [(a, b)]
+            if connectivity == 8:
+                pairs += [(a[:-1], b[1:]), (a[1:], b[:-1])]
+            for u, v in pairs:
+                both = (u > 0) & (v > 0)
+                first.append(u[both])
+                second.append(v[both])
+
+    if first:
+        lut, count = merge_equivalences(offset, np.concatenate(first), np.concatenate(second))
+        return lut[labels], count
+    return labels, offset
+
+def _segment_mask_tiled(gray_image, low_threshold, high_threshold, kernel, min_area, tile_size, halo, workers):
+    """Object mask of segment_image computed tile by tile in a worker pool."""
+    height, width = gray_image.shape
+    tiles = _tiles(gray_image.shape, tile_size)
+    border = gaussian_kernel(5, 1.0).shape[0] // 2
+
+    def tile_edges(tile):
+        # Process the tile with a halo so blur, Canny and closing see their full support
+        y0, y1, x0, x1 = tile
+        ya, yb = max(y0 - halo, 0), min(y1 + halo, height)
+        xa, xb = max(x0 - halo, 0), min(x1 + halo, width)
+        edges = np.zeros((yb - ya, xb - xa), dtype=np.uint8)
+        edges[border:-border, border:-border] = _edge_mask(gray_image[ya:yb, xa:xb], low_threshold, high_threshold, kernel)
+        return edges[y0 - ya:y1 - ya, x0 - xa:x1 - xa]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        edges = np.zeros(gray_image.shape, dtype=np.uint8)
+        for (y0, y1, x0, x1), tile in zip(tiles, pool.map(tile_edges, tiles)):
+            edges[y0:y1, x0:x1] = tile
+        # The blur leaves no valid pixels on the outer image border
+        edges[:border], edges[-border:], edges[:, :border], edges[:, -border:] = 0, 0, 0, 0
+
+        # Hole filling: background components that do not reach the image border
+        background, _ = _label_tiled(edges == 0, tiles, 4, pool)
+        outside = np.zeros(background.max() + 1, dtype=bool)
+        outside[np.concatenate([background[0], background[-1], background[:, 0], background[:, -1]])] = True
+        outside[0] = False
+        objects = (edges > 0) | ((background > 0) & ~outside[background])
+
+        # Objects cut by the seams are merged by label equivalence, then filtered on area
+        labels, num_labels = _label_tiled(objects, tiles, 8, pool)
+
+    area = np.bincount(labels.ravel(), minlength=num_labels + 1)
+    keep = np.where(area > min_area, 255, 0).astype(np.uint8)
+    keep[0] = 0
+    return keep[labels]
+
+@supports_batch()
+@supports_roi()
+def segment_image(image, low_threshold = 50, high_threshold = 100, min_area = None, dpi = None,
+                  tile_size = None, halo = 32, workers = None):
+    """
+    Edge-based segmentation: Canny edges, closing, hole filling and an area filter.
+
+    `min_area` defaults to MIN_OBJECT_AREA scaled with the image DPI (when
+    known) or size. With `tile_size` set, blur, edge detection and closing
+    run per tile (with a `halo` of context pixels) in a pool of `workers`
+    threads, and objects cut by tile borders are merged by label
+    equivalence. Hysteresis is local to the tile plus its halo, so edges can
+    differ slightly from the untiled result right at the seams.
+    """
     # If image = 4D, get only 3 channels
     image = np.array(image)
     image = image[:, :, :3]
     
-     # Convert to grayscale
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        gray_image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        gray_image = gray_image.astype(np.uint8)
-    else:
-        gray_image = image.astype(np.uint8)
-
-    # Apply Gaussian blur to reduce noise (predefined gaussian blur)
-    gaussian_k = gaussian_kernel(5, 1.0)
-    blurred_image = convolve(gray_image, gaussian_k)
+    # Convert to grayscale
+    gray_image = to_gray(image)
 
-    # Perform Canny edge detection
-    edges = cv2.Canny(blurred_image, 50, 100)
+    # Minimum object area threshold, scaled with the resolution
+    if min_area is None:
+        min_area = scaled_min_area(gray_image.shape, dpi)
 
-    # Apply morphological operations to enhance edges
     kernel = np.ones((5, 5), np.uint8)
-    edges = cv2.dilate(edges, kernel, iterations=1)
-    edges = cv2.erode(edges, kernel, iterations=1)
-
-    # Find contours
-    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if tile_size is not None:
+        mask = _segment_mask_tiled(gray_image, low_threshold, high_threshold, kernel, min_area,
+                                   tile_size, halo, workers or os.cpu_count())
+    else:
+        # Gaussian blur, Canny edge detection and closing to enhance edges
+        edges = _edge_mask(gray_image, low_threshold, high_threshold, kernel)
 
-    # Filter contours based on area
-    min_area = 1000  # Minimum contour area threshold
-    filtered_contours = [cnt for cnt in contours if cv2.contourArea(cnt) > min_area]
+        # Fill the regions enclosed by the edges
+        objects = fill_holes(edges)
 
-    # Create a mask of zeros
-    mask = np.zeros_like(gray_image)
+        # Label the objects and filter them on area (single LUT lookup)
+        kept = remove_small_objects(objects, min_area)
 
-    # Draw contours on the mask
-    cv2.drawContours(mask, filtered_contours, -1, (255), thickness=cv2.FILLED)
+        # Place the result on a full-size mask (the blur shrinks the image by the kernel border)
+        mask = np.zeros_like(gray_image)
+        offset = gaussian_kernel(5, 1.0).shape[0] // 2
+        mask[offset:offset + kept.shape[0], offset:offset + kept.shape[1]] = kept
 
     # Fill holes in the mask
     mask_filled = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
@@ -159,4 +550,262 @@ def segment_image(image):
     # Bitwise AND operation to extract segmented object
     segmented_object = cv2.bitwise_and(image, image, mask=mask_filled)
     
-    return segmented_object.astype(np.uint8)
+    return segmented_object.astype(working_dtype(image))
+
+
+########################################################## Watershed Segmentation (marker-controlled)
+def _flat_neighbours(indices, width, height, connectivity):
+    """Flat indices of the in-image neighbours of `indices` (pairs of (source position, neighbour))."""
+    rows, cols = np.divmod(indices, width)
+    if connectivity == 4:
+        steps = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    else:
+        steps = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    sources, neighbours = [], []
+    for dy, dx in steps:
+        ny, nx = rows + dy, cols + dx
+        inside = (ny >= 0) & (ny < height) & (nx >= 0) & (nx < width)
+        sources.append(np.flatnonzero(inside))
+        neighbours.append(ny[inside] * width + nx[inside])
+    return np.concatenate(sources), np.concatenate(neighbours)
+
+
+def watershed(gradient, markers, mask=None, connectivity=8):
+    """
+    Marker-controlled watershed by flooding a uint8 gradient image.
+
+    Flooding uses a 256-level bucket queue instead of a heap. A pixel reached
+    from a labelled neighbour takes that label immediately; it is expanded in
+    the current flood level if its gradient is <= the level, otherwise it
+    waits in the bucket of its own gradient value. Each bucket is drained as
+    vectorized FIFO wavefronts and every pixel is labelled and queued once,
+    so the whole run is O(N).
+
+    Args:
+        gradient: Gradient image (uint8)
+        markers: Label image of the seeds (0 = unlabelled)
+        mask: Optional boolean image; pixels outside the mask stay 0
+        connectivity (int): 4 or 8
+
+    Returns:
+        Label image (int32), same labels as the markers
+    """
+    gradient = np.clip(gradient, 0, 255).astype(np.uint8)
+    height, width = gradient.shape
+    grad = gradient.ravel()
+    labels = np.asarray(markers, dtype=np.int32).ravel().copy()
+    allowed = np.ones(labels.shape, dtype=bool) if mask is None else np.asarray(mask, dtype=bool).ravel()
+    labels[~allowed] = 0
+
+    buckets = [[] for _ in range(256)]
+
+    def enqueue(pixels):
+        """Put labelled pixels in the bucket of their gradient value."""
+        order = np.argsort(grad[pixels], kind='stable')
+        pixels = pixels[order]
+        values, starts = np.unique(grad[pixels], return_index=True)
+        for value, chunk in zip(values, np.split(pixels, starts[1:])):
+            buckets[value].append(chunk)
+
+    def expand(sources, level):
+        """Label the free neighbours of `sources`; return the ones to flood at `level`."""
+        position, neighbour = _flat_neighbours(sources, width, height, connectivity)
+        free = (labels[neighbour] == 0) & allowed[neighbour]
+        position, neighbour = position[free], neighbour[free]
+
+        # First come, first served when several sources reach the same pixel
+        neighbour, first = np.unique(neighbour, return_index=True)
+        labels[neighbour] = labels[sources[position[first]]]
+
+        later = grad[neighbour] > level
+        if later.any():
+            enqueue(neighbour[later])
+        return neighbour[~later]
+
+    # The seeds enter the flood at their own level
+    enqueue(np.flatnonzero(labels))
+    for level in range(256):
+        if not buckets[level]:
+            continue
+        wave = np.concatenate(buckets[level])
+        buckets[level] = []
+
+        # Drain the bucket as FIFO wavefronts
+        while wave.size:
+            wave = expand(wave, level)
+
+    return labels.reshape(height, width)
+
+
+def distance_transform_markers(binary, h=2, connectivity=8):
+    """
+    Watershed markers from the maxima of the distance transform of a binary mask.
+
+    Args:
+        binary: Binary image (> 0 is foreground)
+        h (int): Minimum dynamic of a distance maximum; larger values merge more seeds
+        connectivity (int): 4 or 8
+
+    Returns:
+        tuple: (markers, num_markers)
+    """
+    binary = (np.asarray(binary) > 0).astype(np.uint8)
+    distance = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+    distance = np.clip(distance, 0, 255).astype(np.uint8)
+    peaks = h_maxima(distance, h, connectivity)
+    peaks[binary == 0] = 0
+    return label_components(peaks, connectivity)
+
+
+@supports_batch()
+def watershed_segmentation(image, seeds=None, h=2, connectivity=8):
+    """
+    Segment touching objects with a marker-controlled watershed.
+
+    The foreground is found with Otsu thresholding, the flooding relief is
+    the morphological gradient of the grayscale image, and the markers are
+    the distance-transform maxima of the foreground unless seeds are given.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        seeds: Optional marker label image, or a list of (row, col) seed points
+        h (int): Minimum dynamic of a distance maximum (automatic markers only)
+        connectivity (int): 4 or 8
+
+    Returns:
+        Label image (int32, 0 = background)
+    """
+    gray_image = to_gray(image)
+
+    foreground = gray_image > otsu_threshold(gray_image)
+    square = np.ones((3, 3), dtype=np.uint8)
+    gradient = grey_dilation(gray_image, square) - grey_erosion(gray_image, square)
+
+    if seeds is None:
+        markers, _ = distance_transform_markers(foreground, h, connectivity)
+    elif np.ndim(seeds) == 2 and np.shape(seeds) == gray_image.shape:
+        markers = np.asarray(seeds, dtype=np.int32)
+    else:
+        markers = np.zeros(gray_image.shape, dtype=np.int32)
+        for label, (row, col) in enumerate(seeds, start=1):
+            markers[row, col] = label
+
+    return watershed(gradient, markers, mask=foreground, connectivity=connectivity)
+
+
+########################################################## SLIC Superpixels
+@supports_batch()
+def slic_superpixels(image, num_segments=400, compactness=10.0, max_iters=10):
+    """
+    SLIC superpixels with localized search windows.
+
+    Centres start on a regular grid of step S = sqrt(N / num_segments) and are
+    moved to the lowest gradient position of their 3x3 neighbourhood. Each
+    centre only compares itself with the pixels of its 2S x 2S window; the
+    distances of a window are computed in one vectorized pass and the
+    running best distance and label images are updated in place, so no
+    N x k distance matrix is ever built.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        num_segments (int): Approximate number of superpixels
+        compactness (float): Weight of the spatial distance against the colour (Lab) distance
+        max_iters (int): Number of assignment / update iterations
+
+    Returns:
+        Label image (int32, labels 1..num_superpixels)
+    """
+    image = np.array(image)
+    if len(image.shape) == 2:
+        image = np.dstack([image] * 3)
+    image = image[:, :, :3]
+    lab = cv2.cvtColor(image.astype(np.float32) / 255, cv2.COLOR_RGB2LAB)
+    channels = [np.ascontiguousarray(lab[:, :, c]) for c in range(3)]
+    height, width = lab.shape[:2]
+
+    # Regular grid of centres
+    step = np.sqrt(height * width / max(num_segments, 1))
+    grid_h, grid_w = max(int(round(height / step)), 1), max(int(round(width / step)), 1)
+    cy = ((np.arange(grid_h) + 0.5) * height / grid_h).astype(int)
+    cx = ((np.arange(grid_w) + 0.5) * width / grid_w).astype(int)
+    cy, cx = [a.ravel() for a in np.meshgrid(cy, cx, indexing='ij')]
+
+    # Move centres to the lowest gradient in their 3x3 neighbourhood
+    gray = channels[0]
+    gradient = np.full_like(gray, np.inf)
+    gradient[1:-1, 1:-1] = ((gray[2:, 1:-1] - gray[:-2, 1:-1]) ** 2 + (gray[1:-1, 2:] - gray[1:-1, :-2]) ** 2)
+    best = gradient[cy, cx]
+    best_y, best_x = cy.copy(), cx.copy()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            ny, nx = np.clip(cy + dy, 0, height - 1), np.clip(cx + dx, 0, width - 1)
+            value = gradient[ny, nx]
+            better = value < best
+            best[better], best_y[better], best_x[better] = value[better], ny[better], nx[better]
+
+    # Centre features: L, a, b, y, x
+    centres = np.column_stack([lab[best_y, best_x], best_y, best_x]).astype(np.float32)
+    spatial_weight = (compactness / step) ** 2
+    radius = int(np.ceil(step))
+    ys = np.arange(height, dtype=np.float32)
+    xs = np.arange(width, dtype=np.float32)
+
+    distance = np.empty((height, width), dtype=np.float32)
+    labels = np.zeros((height, width), dtype=np.int32)
+    for _ in range(max_iters):
+        distance.fill(np.inf)
+        for index, (l, a, b, y, x) in enumerate(centres):
+            y0, y1 = max(int(y) - radius, 0), min(int(y) + radius + 1, height)
+            x0, x1 = max(int(x) - radius, 0), min(int(x) + radius + 1, width)
+            if y0 >= y1 or x0 >= x1:
+                continue
+            window = (slice(y0, y1), slice(x0, x1))
+
+            # Colour + weighted spatial distance over the centre's window
+            d = (channels[0][window] - l) ** 2
+            d += (channels[1][window] - a) ** 2
+            d += (channels[2][window] - b) ** 2
+            d += spatial_weight * (((ys[y0:y1] - y) ** 2)[:, None] + ((xs[x0:x1] - x) ** 2)[None, :])
+
+            # Build the label image in place
+            closer = d < distance[window]
+            np.copyto(distance[window], d, where=closer)
+            np.copyto(labels[window], index, where=closer)
+
+        # Move every centre to the mean of its pixels (one bincount per feature)
+        flat = labels.ravel()
+        counts = np.bincount(flat, minlength=len(centres))
+        features = [channels[0], channels[1], channels[2],
+                    np.broadcast_to(ys[:, None], (height, width)), np.broadcast_to(xs[None, :], (height, width))]
+        sums = np.stack([np.bincount(flat, weights=f.ravel(), minlength=len(centres)) for f in features], axis=1)
+        occupied = counts > 0
+        centres[occupied] = sums[occupied] / counts[occupied, None]
+
+    # Consecutive labels starting at 1
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels.reshape(height, width).astype(np.int32) + 1
+
+
+def colorize_labels(labels, image):
+    """
+    Paint every label with the mean colour of its pixels (background stays black).
+
+    Args:
+        labels: Label image (0 = background)
+        image: Image the labels were computed on (RGB or grayscale)
+
+    Returns:
+        Colourised image (uint8, or float32 for float input; same number of channels)
+    """
+    image = np.array(image)
+    if len(image.shape) == 3:
+        image = image[:, :, :3]
+    flat_labels = labels.ravel()
+    counts = np.maximum(np.bincount(flat_labels), 1)
+    channels = image.reshape(flat_labels.size, -1)
+
+    # Mean colour of each label as a LUT, one bincount per channel
+    lut = np.stack([np.bincount(flat_labels, weights=channels[:, c]) / counts
+                    for c in range(channels.shape[1])], axis=1)
+    lut[0] = 0
+    return lut[flat_labels].reshape(image.shape).astype(working_dtype(image))
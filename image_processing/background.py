@@ -0,0 +1,134 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Other Necessary Libraries
+import numpy as np
+
+# ============================== Background Subtraction =============================
+# ===================================================================================
+
+########################################################## Incremental Background Model
+class BackgroundModel:
+    """
+    Incremental background model for static-camera video.
+
+    Two per-pixel models are available, both updated in place in float32
+    with O(N) work per frame and no frame history:
+
+    - 'gaussian': running mean and variance with learning rate `learning_rate`;
+      a pixel is foreground when it is more than `threshold` standard
+      deviations away from the mean.
+    - 'median': approximate running median (McFarlane & Schofield); the
+      background moves by `step` towards every new frame and a pixel is
+      foreground when it differs by more than `threshold` grey levels.
+
+    The foreground masks are uint8 0 / 255 images that can be passed straight
+    to the morphology functions (erosion, opening, fill_holes, ...).
+
+    Usage:
+        model = BackgroundModel('gaussian')
+        for frame in frames:
+            mask = model.apply(frame)
+    """
+
+    def __init__(self, method='gaussian', learning_rate=0.02, threshold=None, step=1.0,
+                 initial_variance=225.0, min_variance=16.0):
+        method = method.lower()
+        if method not in ('gaussian', 'median'):
+            raise ValueError("Invalid method. Supported methods are: 'gaussian', 'median'.")
+        self.method = method
+        self.learning_rate = learning_rate
+        self.threshold = threshold if threshold is not None else (2.5 if method == 'gaussian' else 25.0)
+        self.step = step
+        self.initial_variance = initial_variance
+        self.min_variance = min_variance
+        self.reset()
+
+    def reset(self):
+        """Forget the background (e.g. on a new video)."""
+        self.mean = None
+        self.variance = None
+        self.foreground = None
+        return self
+
+    def _gray(self, frame):
+        """Convert a frame to grayscale float32 into the preallocated frame buffer."""
+        frame = np.asarray(frame)
+        if len(frame.shape) == 3 and frame.shape[2] >= 3:
+            np.multiply(frame[..., 0], np.float32(0.2989), out=self._frame)
+            np.multiply(frame[..., 1], np.float32(0.5870), out=self._work)
+            self._frame += self._work
+            np.multiply(frame[..., 2], np.float32(0.1140), out=self._work)
+            self._frame += self._work
+        else:
+            self._frame[...] = frame
+        return self._frame
+
+    def _allocate(self, shape):
+        """Buffers are allocated once per frame size and reused for every frame."""
+        self._frame = np.empty(shape, dtype=np.float32)
+        self._work = np.empty(shape, dtype=np.float32)
+        self._diff = np.empty(shape, dtype=np.float32)
+        self._mask = np.empty(shape, dtype=bool)
+        self.foreground = np.zeros(shape, dtype=np.uint8)
+
+    def apply(self, frame):
+        """
+        Update the model with a frame and return its foreground mask (0 / 255).
+
+        The mask buffer is reused by the next call; copy it to keep it.
+        """
+        shape = np.shape(frame)[:2]
+        if self.mean is None or self.mean.shape != shape:
+            # First frame initialises the background
+            self._allocate(shape)
+            self.mean = self._gray(frame).copy()
+            self.variance = np.full(shape, self.initial_variance, dtype=np.float32)
+            return self.foreground
+
+        gray = self._gray(frame)
+        diff = np.subtract(gray, self.mean, out=self._diff)
+
+        if self.method == 'gaussian':
+            # Foreground test against the current model: d^2 > k^2 var
+            np.multiply(diff, diff, out=self._work)
+            np.greater(self._work, (self.threshold ** 2) * self.variance, out=self._mask)
+
+            # mean += a d ; var += a (d^2 - var)
+            self._work -= self.variance
+            self._work *= self.learning_rate
+            self.variance += self._work
+            np.maximum(self.variance, self.min_variance, out=self.variance)
+            diff *= self.learning_rate
+            self.mean += diff
+        else:
+            np.abs(diff, out=self._work)
+            np.greater(self._work, self.threshold, out=self._mask)
+
+            # Approximate median: move one step towards the frame
+            np.sign(diff, out=diff)
+            diff *= self.step
+            self.mean += diff
+
+        np.multiply(self._mask, 255, out=self.foreground, casting='unsafe')
+        return self.foreground
+
+    def background(self):
+        """Current background estimate as a uint8 image."""
+        if self.mean is None:
+            return None
+        return np.clip(np.rint(self.mean), 0, 255).astype(np.uint8)
@@ -15,6 +15,15 @@
 # ================================== All Libraries ==================================
 # ===================================================================================
 
+# Working Precision
+from utils.precision import WORKING_DTYPE
+from utils.precision import working_dtype
+from utils.precision import is_float
+# Region of Interest
+from utils.roi import supports_roi
+# Batch Processing
+from utils.batch import supports_batch
+
 # Other Necessary Libraries
 import numpy as np
 
@@ -23,15 +32,22 @@ import numpy as np
 
 ########################################################## Hist Equalization
 ########################################################## For Global
+@supports_batch()
+@supports_roi()
 def histEqualization(channel: np.ndarray) -> np.ndarray:
     hist, _ = np.histogram(channel.flatten(), 256, [0, 255])
     cdf = hist.cumsum()
     cdf_norm = ((cdf - cdf.min()) * 255) / (cdf.max() - cdf.min())
+    if is_float(channel):
+        # Working precision: interpolate the mapping between integer levels, no rounding
+        return np.interp(channel, np.arange(256), cdf_norm).astype(WORKING_DTYPE)
     channel_new = cdf_norm[channel.flatten()]
     channel_new = np.reshape(channel_new, channel.shape)
     return channel_new
 
 ########################################################## For Adaptive
+@supports_batch()
+@supports_roi()
 def hist_equalization(img):
     """ Normal Histogram Equalization
 
@@ -42,6 +58,11 @@ def hist_equalization(img):
         : Equalized Image
     """
     array = np.asarray(img)
+    if is_float(array):
+        # Working precision: unfloored mapping, interpolated between integer levels
+        bin_cont, _ = np.histogram(array, 256, [0, 256])
+        cumulative_sumhist = np.cumsum(bin_cont / np.sum(bin_cont))
+        return np.interp(array, np.arange(256), 255 * cumulative_sumhist).astype(WORKING_DTYPE)
     bin_cont = np.bincount(array.flatten(), minlength=256)
     pixels = np.sum(bin_cont)
     bin_cont = bin_cont / pixels
@@ -53,6 +74,8 @@ def hist_equalization(img):
     return arr_back
 
 
+@supports_batch()
+@supports_roi()
 def ahe(img, rx=193, ry=199): # Tested through trial and error on the spine image
     """ Adaptive Histogram Equalization
 
@@ -65,7 +88,7 @@ def ahe(img, rx=193, ry=199): # Tested through trial and error on the spine imag
         : Equalized Image
     """
     v = img
-    img_eq = np.empty((v.shape[0], v.shape[1]), dtype=np.uint8)
+    img_eq = np.empty((v.shape[0], v.shape[1]), dtype=working_dtype(v))
     for i in range(0, v.shape[1], rx):
         for j in range(0, v.shape[0], ry):
             t = v[j:j + ry, i:i + rx]
@@ -15,6 +15,17 @@
 # ================================== All Libraries ==================================
 # ===================================================================================
 
+# Import utilities
+from utils.workspace import get_workspace
+from utils.workspace import box_sum
+from utils.precision import working_dtype
+from utils.roi import supports_roi
+from utils.batch import supports_batch
+from utils.channels import supports_channels
+from utils.channels import keeps_channels
+from utils.channels import to_planes
+from utils.channels import from_planes
+
 # Other Necessary Libraries
 import numpy as np
 
@@ -23,79 +34,132 @@ import numpy as np
 
 ########################################################## Filtering
 ########################################################## Average
-def apply_averaging_filter(image, kernel_size):
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
-    # Define the averaging kernel
-    kernel = np.ones((kernel_size, kernel_size), dtype=np.float32) / (kernel_size ** 2)
+@supports_batch(vectorized=True)
+@supports_roi(lambda kernel_size, *_, **__: kernel_size // 2)
+@supports_channels
+def apply_averaging_filter(image, kernel_size, out=None, workspace=None, per_channel=False, batch=False):
+    """
+    Mean filter with zero padding.
 
-    # Pad the image to handle border pixels
-    padding = kernel_size // 2
-    padded_image = np.pad(image, padding, mode='constant')
+    The padded copy and the running sums live in a reusable workspace, so
+    repeated calls (video, batches) do not allocate full-size temporaries.
 
-    # Create strided view for efficient convolution
-    convolved_image = np.lib.stride_tricks.sliding_window_view(padded_image, (kernel_size, kernel_size))
+    Args:
+        image: Input image (RGB or grayscale)
+        kernel_size (int): Window size
+        out: Optional output buffer
+        workspace (Workspace): Scratch buffer pool (defaults to the thread's own)
+        per_channel (bool): Filter each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
 
-    # Perform convolution
-    filtered_image = np.tensordot(convolved_image, kernel, axes=((-2, -1), (0, 1)))
+    Returns:
+        Filtered image (uint8, or float32 for float input)
+    """
+    workspace = workspace or get_workspace()
+    dtype = working_dtype(image)
+    planes = to_planes(image, dtype, per_channel, batch)
 
-    return filtered_image.astype(np.uint8)
+    # Pad the image to handle border pixels (borders written in place)
+    padding = kernel_size // 2
+    padded_image = workspace.pad(planes, padding)
 
-########################################################## Laplacian
-def laplacian_filter(image, kernel_size):
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
+    # Window sums from separable running sums, then the mean (floored for uint8)
+    if dtype == np.uint8:
+        sums = box_sum(padded_image, kernel_size, kernel_size, workspace)
+        np.floor_divide(sums, kernel_size ** 2, out=sums)
     else:
-        image = image.astype(np.uint8)
+        sums = box_sum(padded_image, kernel_size, kernel_size, workspace, dtype=np.float64)
+        sums /= kernel_size ** 2
+    filtered = out if out is not None and not keeps_channels(image, per_channel, batch) else np.empty(sums.shape, dtype=dtype)
+    filtered[...] = sums
+    return from_planes(filtered, image, per_channel, out, batch)
+
+########################################################## Laplacian
+@supports_batch(vectorized=True)
+@supports_roi(lambda kernel_size, *_, **__: kernel_size // 2)
+@supports_channels
+def laplacian_filter(image, kernel_size, per_channel=False, batch=False):
+    dtype = working_dtype(image)
+    planes = to_planes(image, dtype, per_channel, batch)
     # Define Laplacian kernel
     kernel = np.ones((kernel_size, kernel_size), dtype=np.float32) * -1
     kernel[kernel_size//2, kernel_size//2] = kernel_size**2 - 1
 
     # Pad the image to handle borders
-    padded_image = np.pad(image, ((kernel_size//2, kernel_size//2), (kernel_size//2, kernel_size//2)), mode='constant')
+    padded_image = np.pad(planes, ((0, 0),) * (planes.ndim - 2) + ((kernel_size//2, kernel_size//2), (kernel_size//2, kernel_size//2)), mode='constant')
 
     # Extract patches from the padded image using stride tricks
-    patches = np.lib.stride_tricks.sliding_window_view(padded_image, (kernel_size, kernel_size))
+    patches = np.lib.stride_tricks.sliding_window_view(padded_image, (kernel_size, kernel_size), axis=(-2, -1))
 
     # Perform element-wise multiplication and sum along the last two axes
     filtered_image = np.sum(patches * kernel, axis=(-2, -1))
     
-    # Convert to uint8
-    filtered_image = np.uint8(np.absolute(filtered_image))
+    # Convert to uint8 (float input keeps the unclipped float32 magnitude)
+    if dtype == np.uint8:
+        filtered_image = np.uint8(np.absolute(filtered_image))
+    else:
+        filtered_image = np.absolute(filtered_image).astype(dtype)
 
-    return filtered_image
+    return from_planes(filtered_image, image, per_channel, batch=batch)
 
 ########################################################## Median
-def apply_median_filter(image, kernel_size):
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
+# Upper bound on the scratch buffer holding one band of windows
+MEDIAN_BAND_BYTES = 16 * 1024 * 1024
+
+
+@supports_batch(vectorized=True)
+@supports_roi(lambda kernel_size, *_, **__: kernel_size // 2)
+@supports_channels
+def apply_median_filter(image, kernel_size, out=None, workspace=None, per_channel=False, batch=False):
+    """
+    Median filter with zero padding.
+
+    Windows are gathered one band of rows at a time into a reusable buffer
+    and partially sorted in place, instead of materializing (and sorting) a
+    copy of every window of the image at once.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        kernel_size (int): Window size
+        out: Optional output buffer
+        workspace (Workspace): Scratch buffer pool (defaults to the thread's own)
+        per_channel (bool): Filter each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
+
+    Returns:
+        Filtered image (uint8, or float32 for float input)
+    """
+    workspace = workspace or get_workspace()
+    planes = to_planes(image, working_dtype(image), per_channel, batch)
+
     # Pad the image to handle borders
     pad_width = kernel_size // 2
-    padded_image = np.pad(image, pad_width, mode='constant')
-    
-    # Determine the dimensions of the padded image
-    height, width = padded_image.shape
-    
-    # Extract patches from the padded image using array slicing
-    patches = np.lib.stride_tricks.sliding_window_view(padded_image, (kernel_size, kernel_size))
-    
-    # Reshape patches to make them suitable for median calculation
-    reshaped_patches = patches.reshape(-1, kernel_size * kernel_size)
-    
-    # Calculate median for each patch
-    median_values = np.median(reshaped_patches, axis=1)
-    
-    # Reshape the median values to match the original image dimensions
-    median_image = median_values.reshape(height - kernel_size + 1, width - kernel_size + 1)
-    
-    return median_image.astype(np.uint8)
+    padded_image = workspace.pad(planes, pad_width)
+
+    # Output dimensions (leading axes are colour planes)
+    lead = planes.shape[:-2]
+    height = padded_image.shape[-2] - kernel_size + 1
+    width = padded_image.shape[-1] - kernel_size + 1
+    filtered = out if out is not None and not keeps_channels(image, per_channel, batch) else np.empty(lead + (height, width), dtype=planes.dtype)
+
+    # Middle element(s) of each sorted window; an even count averages the two (floored for uint8)
+    size = kernel_size * kernel_size
+    middle = [size // 2] if size % 2 else [size // 2 - 1, size // 2]
+
+    patches = np.lib.stride_tricks.sliding_window_view(padded_image, (kernel_size, kernel_size), axis=(-2, -1))
+    band = max(1, min(height, MEDIAN_BAND_BYTES // max(1, int(np.prod(lead)) * width * size)))
+    buffer = workspace.borrow(lead + (band, width, kernel_size, kernel_size), planes.dtype, 'median')
+    for top in range(0, height, band):
+        rows = min(band, height - top)
+        windows = buffer[..., :rows, :, :, :]
+        windows[...] = patches[..., top:top + rows, :, :, :]
+        windows = windows.reshape(lead + (rows, width, size))
+        windows.partition(middle, axis=-1)
+        target = filtered[..., top:top + rows, :]
+        if len(middle) == 1:
+            target[...] = windows[..., middle[0]]
+        elif planes.dtype == np.uint8:
+            target[...] = (windows[..., middle[0]].astype(np.uint16) + windows[..., middle[1]]) // 2
+        else:
+            target[...] = (windows[..., middle[0]] + windows[..., middle[1]]) / 2
+    return from_planes(filtered, image, per_channel, out, batch)
@@ -0,0 +1,357 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Working Precision
+from utils.precision import working_dtype
+from utils.batch import supports_batch
+
+# Skew estimation
+from image_processing.hough import estimate_skew
+from image_processing.gradient import canny
+
+# Other Necessary Libraries
+from collections import OrderedDict
+import numpy as np
+import threading
+
+# ================================ Geometric Transforms =============================
+# ===================================================================================
+
+########################################################## Rotations and mirrors (dihedral group)
+class Dihedral:
+    """
+    One of the 8 combinations of 90 degree rotations and mirrors.
+
+    Stored as (transpose, flip_rows, flip_cols), applied in that order to the
+    two spatial axes. Composing steps only updates the three flags, and
+    `apply` returns a strided view of the image, so a chain of rotations
+    and mirrors costs nothing until the pixels are copied (once) by whoever
+    needs them contiguous. Channels, if any, are left alone, so grayscale
+    and colour images work alike.
+    """
+
+    def __init__(self, transpose=False, flip_rows=False, flip_cols=False):
+        self.transpose = bool(transpose)
+        self.flip_rows = bool(flip_rows)
+        self.flip_cols = bool(flip_cols)
+
+    def __eq__(self, other):
+        return isinstance(other, Dihedral) and self.state == other.state
+
+    def __hash__(self):
+        return hash(self.state)
+
+    def __repr__(self):
+        return f"Dihedral(transpose={self.transpose}, flip_rows={self.flip_rows}, flip_cols={self.flip_cols})"
+
+    @property
+    def state(self):
+        return self.transpose, self.flip_rows, self.flip_cols
+
+    @property
+    def is_identity(self):
+        return not any(self.state)
+
+    # Composition: each step returns the transform "self, then the step"
+    def flip_horizontal(self):
+        """Followed by a left-right mirror."""
+        return Dihedral(self.transpose, self.flip_rows, not self.flip_cols)
+
+    def flip_vertical(self):
+        """Followed by an upside-down mirror."""
+        return Dihedral(self.transpose, not self.flip_rows, self.flip_cols)
+
+    def rotate90(self, clockwise=True):
+        """Followed by a quarter turn (transposing swaps the roles of the two flips)."""
+        if clockwise:
+            return Dihedral(not self.transpose, self.flip_cols, not self.flip_rows)
+        return Dihedral(not self.transpose, not self.flip_cols, self.flip_rows)
+
+    def output_shape(self, shape):
+        """Shape of the transformed image."""
+        shape = tuple(shape)
+        return shape[1::-1] + shape[2:] if self.transpose else shape
+
+    def apply(self, image):
+        """
+        The transformed image as a view (no pixels are copied).
+
+        Args:
+            image: Image with the spatial axes first, any number of channels
+
+        Returns:
+            numpy.ndarray view of `image`
+        """
+        view = np.asarray(image)
+        if self.transpose:
+            view = view.swapaxes(0, 1)
+        if self.flip_rows:
+            view = view[::-1]
+        if self.flip_cols:
+            view = view[:, ::-1]
+        return view
+
+
+########################################################## Affine warps
+# Remap tables are cached per (input shape, output shape, matrix, interpolation)
+# up to this many bytes in total, least recently used released first; larger
+# tables are generated band by band and not kept
+REMAP_CACHE_BYTES = 256 * 1024 * 1024
+# Output pixels computed per row band (bounds the temporaries of one band)
+BAND_PIXELS = 1 << 20
+# Taps per axis of each interpolation
+INTERPOLATIONS = {'nearest': 1, 'bilinear': 2, 'bicubic': 4}
+# Bicubic kernel parameter (the value OpenCV uses)
+CUBIC_A = -0.75
+# Constant border added around the source so every tap stays in bounds
+_BORDER = 3
+
+_remap_cache = OrderedDict()
+_remap_bytes = 0
+_remap_lock = threading.Lock()
+
+
+def rotation_matrix(angle, center, scale=1.0):
+    """
+    2x3 affine matrix of a rotation about `center` (same convention as cv2.getRotationMatrix2D).
+
+    Args:
+        angle (float): Degrees, positive is counter-clockwise on screen
+        center: (x, y) rotation centre
+        scale (float): Isotropic scale factor
+
+    Returns:
+        numpy.ndarray of shape (2, 3) mapping input (x, y, 1) to output (x, y)
+    """
+    alpha = scale * np.cos(np.deg2rad(angle))
+    beta = scale * np.sin(np.deg2rad(angle))
+    cx, cy = center
+    return np.array([[alpha, beta, (1 - alpha) * cx - beta * cy],
+                     [-beta, alpha, beta * cx + (1 - alpha) * cy]])
+
+
+def clear_remap_cache():
+    """Drop every cached remap table."""
+    global _remap_bytes
+    with _remap_lock:
+        _remap_cache.clear()
+        _remap_bytes = 0
+
+
+def _inverse(matrix):
+    """Inverse of a 2x3 affine matrix (output (x, y) to input (x, y))."""
+    linear = np.linalg.inv(matrix[:, :2])
+    return np.hstack([linear, -linear @ matrix[:, 2:]])
+
+
+def _band_table(inverse, start, stop, width, source_shape, interpolation):
+    """
+    Remap table of output rows [start, stop): flat index of the first tap in the
+    bordered source and, except for nearest, the fractional offsets.
+
+    Coordinates are clamped to the border, where every tap reads the border
+    value (points clamped to the far edge have a zero fraction, so only the
+    border tap has weight).
+    """
+    height_in, width_in = source_shape
+    padded_width = width_in + 2 * _BORDER
+    ys = np.arange(start, stop, dtype=np.float64)[:, None]
+    xs = np.arange(width, dtype=np.float64)[None, :]
+    sx = np.clip(inverse[0, 0] * xs + inverse[0, 1] * ys + inverse[0, 2], 1 - _BORDER, width_in)
+    sy = np.clip(inverse[1, 0] * xs + inverse[1, 1] * ys + inverse[1, 2], 1 - _BORDER, height_in)
+    if interpolation == 'nearest':
+        x0, y0 = np.floor(sx + 0.5), np.floor(sy + 0.5)
+        return ((y0 + _BORDER) * padded_width + x0 + _BORDER).astype(np.int32).ravel(),
+    x0, y0 = np.floor(sx), np.floor(sy)
+    fx, fy = (sx - x0).astype(np.float32).ravel(), (sy - y0).astype(np.float32).ravel()
+    if interpolation == 'bicubic':
+        # Four taps per axis start one pixel before the sample
+        x0, y0 = x0 - 1, y0 - 1
+    return ((y0 + _BORDER) * padded_width + x0 + _BORDER).astype(np.int32).ravel(), fx, fy
+
+
+def _remap_tables(source_shape, output_shape, matrix, interpolation, band_rows):
+    """
+    (start, stop, table) for every row band, from the cache when possible.
+
+    Returns a list (cached) or a generator (tables too large to keep).
+    """
+    global _remap_bytes
+    height, width = output_shape
+    inverse = _inverse(np.asarray(matrix, dtype=np.float64))
+    bands = [(start, min(start + band_rows, height)) for start in range(0, height, band_rows)]
+    key = (tuple(source_shape), tuple(output_shape), inverse.tobytes(), interpolation, band_rows)
+    with _remap_lock:
+        tables = _remap_cache.get(key)
+        if tables is not None:
+            _remap_cache.move_to_end(key)
+            return tables
+
+    per_pixel = 4 if interpolation == 'nearest' else 12
+    if height * width * per_pixel > REMAP_CACHE_BYTES:
+        return ((start, stop, _band_table(inverse, start, stop, width, source_shape, interpolation))
+                for start, stop in bands)
+
+    tables = [(start, stop, _band_table(inverse, start, stop, width, source_shape, interpolation))
+              for start, stop in bands]
+    size = sum(array.nbytes for _, _, table in tables for array in table)
+    with _remap_lock:
+        if key not in _remap_cache:
+            _remap_cache[key] = tables
+            _remap_bytes += size
+        while _remap_bytes > REMAP_CACHE_BYTES and len(_remap_cache) > 1:
+            _, released = _remap_cache.popitem(last=False)
+            _remap_bytes -= sum(array.nbytes for _, _, table in released for array in table)
+    return tables
+
+
+def _weights(fraction, interpolation):
+    """Per-tap weights along one axis for the fractional offsets."""
+    if interpolation == 'bilinear':
+        return [1 - fraction, fraction]
+    a = CUBIC_A
+    t = fraction + 1
+    w0 = ((a * t - 5 * a) * t + 8 * a) * t - 4 * a
+    w1 = ((a + 2) * fraction - (a + 3)) * fraction * fraction + 1
+    t = 1 - fraction
+    w2 = ((a + 2) * t - (a + 3)) * t * t + 1
+    return [w0, w1, w2, 1 - w0 - w1 - w2]
+
+
+@supports_batch()
+def warp_affine(image, matrix, output_shape=None, interpolation='bilinear', border_value=0,
+                band_rows=None, out=None):
+    """
+    Affine warp with nearest, bilinear or bicubic interpolation and a constant border.
+
+    The inverse mapping of every output pixel (the remap table) is computed
+    once per (input shape, output shape, matrix, interpolation) and cached,
+    so warping every frame of a video with the same matrix only gathers
+    pixels. Output rows are produced in bands of about BAND_PIXELS pixels,
+    which bounds the temporaries on large scans.
+
+    Args:
+        image: Input image (grayscale or any number of channels)
+        matrix: 2x3 matrix mapping input (x, y, 1) to output (x, y)
+        output_shape: (height, width) of the result (defaults to the input's)
+        interpolation (str): 'nearest', 'bilinear' or 'bicubic'
+        border_value: Value of pixels mapped from outside the image
+        band_rows (int): Output rows per band (defaults from BAND_PIXELS)
+        out: Optional output buffer (any layout, e.g. a channel of a larger image)
+
+    Returns:
+        Warped image (uint8, or float32 for float input)
+    """
+    if interpolation not in INTERPOLATIONS:
+        raise ValueError("Invalid interpolation. Supported values are: 'nearest', 'bilinear', 'bicubic'.")
+    image = np.asarray(image)
+    dtype = working_dtype(image)
+    height, width = output_shape if output_shape is not None else image.shape[:2]
+    band_rows = band_rows or max(1, BAND_PIXELS // max(1, width))
+    if out is None:
+        out = np.empty((height, width) + image.shape[2:], dtype=dtype)
+
+    # Source with a constant border, flattened to pixels (x channels)
+    pad = ((_BORDER, _BORDER), (_BORDER, _BORDER)) + ((0, 0),) * (image.ndim - 2)
+    padded = np.pad(image, pad, mode='constant', constant_values=border_value)
+    padded_width = padded.shape[1]
+    flat = padded.reshape((padded.shape[0] * padded_width,) + image.shape[2:])
+    flat = flat.astype(dtype if interpolation == 'nearest' else np.float32, copy=False)
+    # Per-pixel weights broadcast over the channels
+    weight_shape = (-1,) + (1,) * (flat.ndim - 1)
+
+    taps = INTERPOLATIONS[interpolation]
+    for start, stop, table in _remap_tables(image.shape[:2], (height, width), matrix, interpolation, band_rows):
+        # Pixels of the band are written through a flat view; a non-contiguous `out` (whose
+        # reshape would be a copy) gets the band through a temporary instead
+        band = out[start:stop]
+        shape = ((stop - start) * width,) + image.shape[2:]
+        direct = band.flags.c_contiguous and (interpolation != 'nearest' or band.dtype == flat.dtype)
+        if interpolation == 'nearest':
+            target = band.reshape(shape) if direct else np.empty(shape, dtype=flat.dtype)
+            np.take(flat, table[0], axis=0, out=target)
+            if not direct:
+                band[...] = target.reshape(band.shape)
+            continue
+        base, fx, fy = table
+        weights_x = [w.reshape(weight_shape) for w in _weights(fx, interpolation)]
+        weights_y = [w.reshape(weight_shape) for w in _weights(fy, interpolation)]
+        # Separable: interpolate along each tap row, then across the rows; tap (dy, dx)
+        # is read through a shifted view of the source, so no index arrays are built
+        values = None
+        for dy in range(taps):
+            row = None
+            for dx in range(taps):
+                sample = np.take(flat[dy * padded_width + dx:], base, axis=0)
+                sample *= weights_x[dx]
+                row = sample if row is None else np.add(row, sample, out=row)
+            row *= weights_y[dy]
+            values = row if values is None else np.add(values, row, out=values)
+        if dtype == np.uint8:
+            np.rint(values, out=values)
+            np.clip(values, 0, 255, out=values)
+        if direct:
+            band.reshape(shape)[...] = values
+        else:
+            band[...] = values.reshape(band.shape)
+    return out
+
+
+def rotate(image, angle, interpolation='bilinear', expand=False, border_value=0):
+    """
+    Rotation by an arbitrary angle about the image centre.
+
+    Args:
+        image: Input image
+        angle (float): Degrees, positive is counter-clockwise
+        interpolation (str): 'nearest', 'bilinear' or 'bicubic'
+        expand (bool): Enlarge the output to hold the whole rotated image
+        border_value: Value of the uncovered corners
+
+    Returns:
+        Rotated image
+    """
+    height, width = np.shape(image)[:2]
+    matrix = rotation_matrix(angle, ((width - 1) / 2, (height - 1) / 2))
+    output_shape = (height, width)
+    if expand:
+        cos, sin = abs(matrix[0, 0]), abs(matrix[0, 1])
+        output_shape = (int(np.ceil(height * cos + width * sin)), int(np.ceil(width * cos + height * sin)))
+        # Re-centre the rotated image in the larger output
+        matrix[0, 2] += (output_shape[1] - width) / 2
+        matrix[1, 2] += (output_shape[0] - height) / 2
+    return warp_affine(image, matrix, output_shape, interpolation, border_value)
+
+
+def deskew(image, interpolation='bilinear', border_value=255, max_skew=np.pi / 4):
+    """
+    Straighten a scanned page by the dominant text / line angle (see hough.estimate_skew).
+
+    Args:
+        image: Page image
+        interpolation (str): 'nearest', 'bilinear' or 'bicubic'
+        border_value: Value of the uncovered corners (white page margin by default)
+        max_skew (float): Largest skew considered, in radians
+
+    Returns:
+        tuple: (straightened image, skew angle in degrees)
+    """
+    skew = np.rad2deg(estimate_skew(canny(image), max_skew=max_skew))
+    if skew == 0:
+        return np.array(image, dtype=working_dtype(image)), 0.0
+    # Lines descending to the right (positive skew) are levelled by a counter-clockwise turn
+    return rotate(image, skew, interpolation, border_value=border_value), skew
@@ -0,0 +1,197 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Morphology
+from image_processing.morphology import label_components
+
+# Utilities
+from utils.cache import clear_cache
+from utils.cache import memoize
+from utils.color import to_gray
+from utils.precision import working_dtype
+from utils.batch import supports_batch
+
+# Other Necessary Libraries
+import numpy as np
+
+# ================================ Gradient Cache ===================================
+# ===================================================================================
+
+# Separable derivative operators: (smoothing taps, derivative taps)
+OPERATORS = {
+    'sobel': (np.array([1, 2, 1], dtype=np.float32), np.array([-1, 0, 1], dtype=np.float32)),
+    'scharr': (np.array([3, 10, 3], dtype=np.float32), np.array([-1, 0, 1], dtype=np.float32)),
+}
+
+
+def clear_gradient_cache():
+    """Drop every memoized gradient (edited images are detected without it, see utils.cache)."""
+    clear_cache()
+
+
+def _read_only(result):
+    """Protect a cached result from callers (a modified copy would be served to later callers)."""
+    result.flags.writeable = False
+    return result
+
+
+def _to_gray(image):
+    """Grayscale float32 version of an RGB or grayscale image (uint8 input is truncated first, as before)."""
+    return to_gray(image, working_dtype(image)).astype(np.float32, copy=False)
+
+
+# ==================================== Gradients ====================================
+# ===================================================================================
+
+########################################################## Derivatives
+@supports_batch()
+def image_gradients(image, operator='sobel'):
+    """
+    Horizontal and vertical derivatives of an image (Sobel or Scharr).
+
+    Both operators are separable, so each derivative is a 3-tap smoothing
+    pass and a 3-tap difference pass on shifted views of a border-replicated
+    copy. Results are memoized per image buffer and read-only.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        operator (str): 'sobel' or 'scharr'
+
+    Returns:
+        tuple: (gx, gy) read-only float32 images
+    """
+    operator = operator.lower()
+    if operator not in OPERATORS:
+        raise ValueError("Invalid operator. Supported operators are: 'sobel', 'scharr'.")
+
+    def compute():
+        smooth, derive = OPERATORS[operator]
+        padded = np.pad(_to_gray(image), 1, mode='edge')
+        height, width = padded.shape[0] - 2, padded.shape[1] - 2
+
+        def rows(taps, source):
+            return taps[0] * source[:-2] + taps[1] * source[1:-1] + taps[2] * source[2:]
+
+        def cols(taps, source):
+            return taps[0] * source[:, :-2] + taps[1] * source[:, 1:-1] + taps[2] * source[:, 2:]
+
+        gx = cols(derive, rows(smooth, padded)).reshape(height, width)
+        gy = rows(derive, cols(smooth, padded)).reshape(height, width)
+        return _read_only(gx), _read_only(gy)
+
+    return memoize(image, ('gradients', operator), compute)
+
+
+@supports_batch()
+def gradient_magnitude(image, operator='sobel', l2_gradient=True):
+    """
+    Gradient magnitude, sqrt(gx^2 + gy^2) or |gx| + |gy| when l2_gradient is False.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        operator (str): 'sobel' or 'scharr'
+        l2_gradient (bool): Use the L2 norm instead of the L1 norm
+
+    Returns:
+        float32 magnitude image (read-only, memoized)
+    """
+    def compute():
+        gx, gy = image_gradients(image, operator)
+        return _read_only(np.hypot(gx, gy) if l2_gradient else np.abs(gx) + np.abs(gy))
+
+    return memoize(image, ('magnitude', operator.lower(), l2_gradient), compute)
+
+
+@supports_batch()
+def gradient_orientation(image, operator='sobel'):
+    """
+    Gradient orientation quantized to 4 directions.
+
+    Codes: 0 = horizontal gradient (0 deg), 1 = 45 deg, 2 = vertical (90 deg),
+    3 = 135 deg, with the y axis pointing down. The sector borders at 22.5 and
+    67.5 degrees are tested with tangent ratios instead of arctan2.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        operator (str): 'sobel' or 'scharr'
+
+    Returns:
+        uint8 orientation code image (read-only, memoized)
+    """
+    def compute():
+        gx, gy = image_gradients(image, operator)
+        ax, ay = np.abs(gx), np.abs(gy)
+        tan_22 = np.float32(np.tan(np.pi / 8))
+        tan_67 = np.float32(np.tan(3 * np.pi / 8))
+
+        codes = np.where((gx * gy) > 0, 1, 3).astype(np.uint8)
+        codes[ay <= tan_22 * ax] = 0
+        codes[ay >= tan_67 * ax] = 2
+        return _read_only(codes)
+
+    return memoize(image, ('orientation', operator.lower()), compute)
+
+
+# ====================================== Canny ======================================
+# ===================================================================================
+
+########################################################## Canny Edge Detection
+@supports_batch()
+def canny(image, low_threshold=50, high_threshold=100, operator='sobel', l2_gradient=False):
+    """
+    Canny edge detector built on the memoized gradients.
+
+    Non-maximum suppression compares every pixel with its two neighbours
+    along the quantized gradient direction using shifted views of the padded
+    magnitude. Hysteresis labels the connected components of the weak edge
+    mask and keeps the components that contain at least one strong pixel.
+    Like cv2.Canny, no smoothing is applied and L1 magnitude is the default.
+
+    Args:
+        image: Input image (RGB or grayscale), usually already blurred
+        low_threshold (float): Weak edge threshold
+        high_threshold (float): Strong edge threshold
+        operator (str): 'sobel' or 'scharr'
+        l2_gradient (bool): Use the L2 gradient norm
+
+    Returns:
+        Edge image (0 / 255)
+    """
+    magnitude = gradient_magnitude(image, operator, l2_gradient)
+    orientation = gradient_orientation(image, operator)
+    height, width = magnitude.shape
+    padded = np.pad(magnitude, 1, mode='constant')
+
+    def shifted(dy, dx):
+        return padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+
+    # Neighbour pairs along each quantized direction
+    neighbours = {0: ((0, -1), (0, 1)), 1: ((-1, -1), (1, 1)), 2: ((-1, 0), (1, 0)), 3: ((-1, 1), (1, -1))}
+    maxima = np.zeros((height, width), dtype=bool)
+    for code, (before, after) in neighbours.items():
+        # Ties are broken towards one side on the axes and suppressed on the diagonals (as in cv2.Canny)
+        after_test = magnitude >= shifted(*after) if code in (0, 2) else magnitude > shifted(*after)
+        maxima |= (orientation == code) & (magnitude > shifted(*before)) & after_test
+
+    # Hysteresis: weak components connected to a strong pixel
+    weak = maxima & (magnitude > low_threshold)
+    strong = weak & (magnitude > high_threshold)
+    labels, num_labels = label_components(weak, connectivity=8)
+    keep = np.zeros(num_labels + 1, dtype=working_dtype(image))
+    keep[np.unique(labels[strong])] = 255
+    keep[0] = 0
+    return keep[labels]
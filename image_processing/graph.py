@@ -0,0 +1,303 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Working Precision
+from utils.precision import WORKING_DTYPE
+from utils.precision import is_float
+
+# Other Necessary Libraries
+from abc import ABC
+from abc import abstractmethod
+import numpy as np
+
+# ================================ Lazy Image Graph =================================
+# ===================================================================================
+#
+# Operations append nodes to a DAG instead of computing pixels. Nothing is
+# evaluated until `evaluate` (or `preview`) is called, and then only for the
+# requested region and resolution:
+#
+#   image = lazy(rgb).point(brightness(20)).point(gamma(0.8)).neighbourhood(blur, halo=2)
+#   small = image.preview(840)                 # subsampled evaluation for display
+#   crop = image.evaluate((0, 0, 256, 256))    # top, left, bottom, right
+#   full = image.evaluate()
+#
+# Nodes are immutable; appending a node returns a new expression, so earlier
+# expressions (and branches sharing a subgraph) stay valid.
+
+# Rows per band when a fused point chain is applied to float images
+BAND_ROWS = 64
+
+
+def _clip_region(region, shape):
+    """Normalize a (top, left, bottom, right) region to the image bounds."""
+    height, width = shape[:2]
+    if region is None:
+        return 0, 0, height, width
+    top, left, bottom, right = region
+    return max(0, top), max(0, left), min(height, bottom), min(width, right)
+
+
+class Node(ABC):
+    """Base class of lazy image expressions."""
+
+    def __init__(self, *inputs):
+        self.inputs = inputs
+
+    @property
+    @abstractmethod
+    def shape(self):
+        """Output shape (height and width at least), without computing pixels where possible."""
+
+    @abstractmethod
+    def _compute(self, region, step):
+        """Pixels of a clipped (top, left, bottom, right) region, subsampled by `step`."""
+
+    def evaluate(self, region=None, step=1):
+        """
+        Compute the pixels of the expression.
+
+        Args:
+            region: (top, left, bottom, right) in full-resolution pixels, or None
+            step (int): Subsampling step; the result is region[::step, ::step]
+
+        Returns:
+            numpy.ndarray
+        """
+        return self._compute(_clip_region(region, self.shape), max(1, int(step)))
+
+    def preview(self, max_size, region=None):
+        """Evaluate at the coarsest integer subsampling that keeps max(height, width) >= max_size."""
+        top, left, bottom, right = _clip_region(region, self.shape)
+        return self.evaluate((top, left, bottom, right), max(1, max(bottom - top, right - left) // max_size))
+
+    # Expression building
+    def point(self, function):
+        """Append a point-wise operation (fused with adjacent point-wise operations)."""
+        return PointOp(self, function)
+
+    def neighbourhood(self, function, halo, scaled=None):
+        """
+        Append an operation whose output pixel depends on the input within `halo` pixels.
+
+        Args:
+            function: The operation
+            halo (int): Footprint radius in pixels
+            scaled: Optional `scaled(step)` returning the operation for an
+                input subsampled by `step` (e.g. with a smaller kernel); when
+                given, previews run it on the subsampled input
+        """
+        return NeighbourhoodOp(self, function, halo, scaled)
+
+    def apply(self, function, *others):
+        """Append an operation that needs its whole input image(s) (histograms, segmentation, ...)."""
+        return GlobalOp(function, self, *others)
+
+
+class Source(Node):
+    """Leaf node wrapping an existing image (region and step are plain views)."""
+
+    def __init__(self, image):
+        super().__init__()
+        self.image = np.asarray(image)
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    def _compute(self, region, step):
+        top, left, bottom, right = region
+        return self.image[top:bottom:step, left:right:step]
+
+
+class PointOp(Node):
+    """
+    Chain of point-wise functions, fused into one pass.
+
+    Appending a point-wise function to a PointOp creates a single node with
+    the longer chain. uint8 input is mapped through a 256-entry LUT built by
+    running the chain on every possible value; other input runs the whole
+    chain band by band, so each pixel is read and written once. Point-wise
+    functions commute with subsampling and cropping, so previews and regions
+    only touch the pixels they return.
+    """
+
+    def __init__(self, source, function):
+        if isinstance(source, PointOp):
+            functions = source.functions + (function,)
+            source = source.inputs[0]
+        else:
+            functions = (function,)
+        super().__init__(source)
+        self.functions = functions
+
+    @property
+    def shape(self):
+        return self.inputs[0].shape
+
+    def lut(self, dtype=np.uint8):
+        """The fused chain as a lookup table over every value of an integer dtype."""
+        info = np.iinfo(dtype)
+        values = np.arange(info.min, info.max + 1, dtype=dtype)
+        for function in self.functions:
+            values = function(values)
+        return np.asarray(values)
+
+    def _compute(self, region, step):
+        source = self.inputs[0]._compute(region, step)
+        if source.dtype == np.uint8:
+            return self.lut()[source]
+
+        out = None
+        for top in range(0, source.shape[0], BAND_ROWS):
+            band = source[top:top + BAND_ROWS]
+            for function in self.functions:
+                band = function(band)
+            if out is None:
+                out = np.empty(source.shape[:1] + band.shape[1:], dtype=band.dtype)
+            out[top:top + band.shape[0]] = band
+        return out if out is not None else source.copy()
+
+
+class NeighbourhoodOp(Node):
+    """
+    Operation with a bounded footprint (filters, morphology).
+
+    A region is computed from the input region grown by `halo` pixels and
+    cropped back; at the image border the function's own padding applies,
+    so regions match the whole-image result exactly. The function must keep
+    the image size.
+
+    Subsampled evaluation subsamples the full-resolution result, so previews
+    match what is saved, but cost a full-resolution pass (the whole-image
+    result is kept). With a `scaled` operation, subsampled evaluation instead
+    runs `scaled(step)` on the subsampled input, touching only the pixels it
+    returns; such previews approximate the full-resolution result.
+    """
+
+    def __init__(self, source, function, halo, scaled=None):
+        super().__init__(source)
+        self.function = function
+        self.halo = int(halo)
+        self.scaled = scaled
+        self._result = None
+
+    @property
+    def shape(self):
+        return self.inputs[0].shape[:2] if self._result is None else self._result.shape
+
+    def _compute(self, region, step):
+        height, width = self.inputs[0].shape[:2]
+        if step > 1 and self.scaled is not None and self._result is None:
+            return self._compute_scaled(region, step)
+        if region == (0, 0, height, width):
+            if self._result is None:
+                self._result = self.function(self.inputs[0]._compute(region, 1))
+            return self._result[::step, ::step]
+
+        top, left, bottom, right = region
+        grown = _clip_region((top - self.halo, left - self.halo, bottom + self.halo, right + self.halo),
+                             (height, width))
+        result = self.function(self.inputs[0]._compute(grown, 1))
+        return result[top - grown[0]:bottom - grown[0]:step, left - grown[1]:right - grown[1]:step]
+
+    def _compute_scaled(self, region, step):
+        """Run the scaled operation on the subsampled input, grown by the halo on the same grid."""
+        height, width = self.inputs[0].shape[:2]
+        top, left, bottom, right = region
+        halo = -(-self.halo // step)  # in subsampled pixels
+        # Grow by whole steps so the subsampled grid still passes through (top, left)
+        rows = min(halo, top // step)
+        cols = min(halo, left // step)
+        grown = (top - rows * step, left - cols * step,
+                 min(height, bottom + halo * step), min(width, right + halo * step))
+        result = self.scaled(step)(self.inputs[0]._compute(grown, step))
+        return result[rows:rows + len(range(top, bottom, step)), cols:cols + len(range(left, right, step))]
+
+
+class GlobalOp(Node):
+    """
+    Operation that needs whole input images; its full result is computed once and kept.
+
+    Regions and subsampling are taken from the cached full-resolution result.
+    """
+
+    def __init__(self, function, *inputs):
+        super().__init__(*inputs)
+        self.function = function
+        self._result = None
+
+    def _full(self):
+        if self._result is None:
+            self._result = np.asarray(self.function(*[node.evaluate() for node in self.inputs]))
+        return self._result
+
+    @property
+    def shape(self):
+        return self._full().shape
+
+    def _compute(self, region, step):
+        top, left, bottom, right = region
+        return self._full()[top:bottom:step, left:right:step]
+
+
+def lazy(image):
+    """Start an expression from an image (expressions are returned unchanged)."""
+    return image if isinstance(image, Node) else Source(image)
+
+
+def materialize(image):
+    """Full-resolution pixels of an expression (arrays are returned unchanged)."""
+    return image.evaluate() if isinstance(image, Node) else image
+
+
+# ================================ Point Operations =================================
+# ===================================================================================
+#
+# Point-wise functions with the app's semantics: clipped to [0, 255] and
+# truncated to uint8 for uint8 input, float32 without rounding otherwise.
+
+def _result(values, like):
+    return values.astype(WORKING_DTYPE if is_float(like) else np.uint8)
+
+
+def brightness(value):
+    """Add `value` to every pixel."""
+    def function(image):
+        return _result(np.clip(image.astype(np.float32) + value, 0, 255), image)
+    return function
+
+
+def contrast(factor):
+    """Multiply every pixel by `factor`."""
+    def function(image):
+        return _result(np.clip(image.astype(np.float32) * factor, 0, 255), image)
+    return function
+
+
+def gamma(power):
+    """255 * (pixel / 255) ** power."""
+    def function(image):
+        return _result(255 * (image / 255) ** power, image)
+    return function
+
+
+def threshold(level):
+    """255 where pixel > level, else 0 (per channel)."""
+    def function(image):
+        return _result(np.where(image > level, 255, 0), image)
+    return function
@@ -0,0 +1,117 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Morphology
+from image_processing.morphology import grey_dilation
+
+# Utilities
+from utils.batch import supports_batch
+
+# Other Necessary Libraries
+import numpy as np
+
+# ================================= Hough Transform =================================
+# ===================================================================================
+
+########################################################## Hough Lines
+@supports_batch()
+def hough_lines(image, num_angles=180, vote_chunk=1 << 21):
+    """
+    Hough line transform of a binary edge image.
+
+    Edge points are taken from np.nonzero; rho = x cos(theta) + y sin(theta)
+    is computed for all angles of a chunk of points at once and every vote
+    of the chunk is accumulated with a single np.bincount on the flattened
+    (rho, theta) indices. Chunks hold about `vote_chunk` votes (points times
+    angles), so the temporaries stay bounded whatever the angle count.
+
+    Args:
+        image: Edge image (RGB or grayscale, nonzero pixels are edge points),
+            e.g. the output of Binary_OTSU, canny or segment_image
+        num_angles (int): Number of angles in [-pi/2, pi/2)
+        vote_chunk (int): Votes (points x angles) per chunk, at least one point's
+            (bounds memory; chunk_size is the batch option, see utils.batch)
+
+    Returns:
+        tuple: (accumulator, thetas, rhos) with accumulator of shape (len(rhos), len(thetas))
+    """
+    image = np.asarray(image)
+    if len(image.shape) == 3:
+        image = image.any(axis=2)
+    height, width = image.shape
+
+    thetas = np.linspace(-np.pi / 2, np.pi / 2, num_angles, endpoint=False)
+    offset = int(np.ceil(np.hypot(height, width)))
+    rhos = np.arange(-offset, offset + 1, dtype=np.float64)
+    cos_t, sin_t = np.cos(thetas), np.sin(thetas)
+    theta_index = np.arange(num_angles, dtype=np.int32)
+
+    ys, xs = np.nonzero(image)
+    accumulator = np.zeros(rhos.size * num_angles, dtype=np.int64)
+    points = max(1, vote_chunk // num_angles)
+    for start in range(0, xs.size, points):
+        x = xs[start:start + points, None]
+        y = ys[start:start + points, None]
+        rho_index = np.rint(x * cos_t + y * sin_t).astype(np.int32) + np.int32(offset)
+        accumulator += np.bincount((rho_index * num_angles + theta_index).ravel(), minlength=accumulator.size)
+
+    return accumulator.reshape(rhos.size, num_angles), thetas, rhos
+
+
+def hough_line_peaks(accumulator, thetas, rhos, num_peaks=10, threshold=None, min_distance=9, min_angle=10):
+    """
+    Strongest lines of a Hough accumulator.
+
+    A cell is a candidate when it equals the maximum of its
+    (2 * min_distance + 1) x (2 * min_angle + 1) neighbourhood (a vectorized
+    grey dilation of the accumulator); candidates above `threshold`
+    (default: half the global maximum) are returned by decreasing votes.
+
+    Returns:
+        list: (votes, theta, rho) tuples
+    """
+    if threshold is None:
+        threshold = 0.5 * accumulator.max()
+    window = np.ones((2 * min_distance + 1, 2 * min_angle + 1), dtype=np.uint8)
+    candidates = (accumulator >= grey_dilation(accumulator, window)) & (accumulator >= threshold) & (accumulator > 0)
+
+    rho_index, theta_index = np.nonzero(candidates)
+    votes = accumulator[rho_index, theta_index]
+    order = np.argsort(-votes, kind='stable')[:num_peaks]
+    return [(int(votes[i]), float(thetas[theta_index[i]]), float(rhos[rho_index[i]])) for i in order]
+
+
+@supports_batch()
+def estimate_skew(image, num_angles=720, num_peaks=20, max_skew=np.pi / 4):
+    """
+    Dominant text / line skew angle of a binary page image, in radians.
+
+    Near-horizontal lines have a normal angle theta close to +-pi/2; the skew
+    is the vote-weighted mean deviation of the strongest such lines. The
+    angle is positive when the lines descend to the right (y axis down).
+    """
+    accumulator, thetas, rhos = hough_lines(image, num_angles)
+    peaks = hough_line_peaks(accumulator, thetas, rhos, num_peaks)
+    if not peaks:
+        return 0.0
+    votes = np.array([p[0] for p in peaks], dtype=np.float64)
+    theta = np.array([p[1] for p in peaks])
+    skew = np.where(theta > 0, theta - np.pi / 2, theta + np.pi / 2)
+    near = np.abs(skew) <= max_skew
+    if not near.any():
+        return 0.0
+    return float(np.average(skew[near], weights=votes[near]))
@@ -0,0 +1,160 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Morphology
+from image_processing.morphology import grey_dilation
+
+# Grayscale Conversion
+from utils.color import to_gray
+
+# Other Necessary Libraries
+import numpy as np
+
+# ================================ Template Matching ================================
+# ===================================================================================
+
+########################################################## Helpers
+def _fast_length(n):
+    """Smallest 2^a 3^b 5^c >= n (sizes the FFT handles fastest)."""
+    best = 1 << int(np.ceil(np.log2(max(n, 1))))
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def _integral_image(image):
+    """Summed-area table with a leading row and column of zeros."""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0), axis=1, out=integral[1:, 1:])
+    return integral
+
+
+def _window_sums(integral, height, width):
+    """Sum of every height x width window (valid positions) from a summed-area table."""
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+########################################################## Template
+class Template:
+    """
+    A matching template with its spectrum cached per FFT size.
+
+    Building the zero-mean template and its FFT once lets the same template
+    be matched against many images (or PDF pages) of the same size at the
+    cost of one forward and one inverse FFT of the image each.
+    """
+
+    def __init__(self, template):
+        # Float grayscale (shared, memoized conversion), in float64 for the correlation sums
+        template = to_gray(template, np.float32).astype(np.float64)
+        self.shape = template.shape
+        self.zero_mean = template - template.mean()
+        self.energy = np.sum(self.zero_mean ** 2)
+        self._spectra = {}
+
+    def spectrum(self, fft_shape):
+        """Conjugate spectrum of the zero-mean template for an FFT of `fft_shape`."""
+        if fft_shape not in self._spectra:
+            self._spectra[fft_shape] = np.conj(np.fft.rfft2(self.zero_mean, fft_shape))
+        return self._spectra[fft_shape]
+
+
+########################################################## Normalized Cross-Correlation
+def match_template(image, template, top_k=1, min_distance=None, threshold=None):
+    """
+    Zero-mean normalized cross-correlation of a template over an image.
+
+    The correlation numerator is computed in the frequency domain; the local
+    mean and energy of the image under every template position come from
+    integral images of x and x^2, so the cost is O(N log N) instead of
+    O(N * T). Scores match cv2.TM_CCOEFF_NORMED and lie in [-1, 1].
+
+    Args:
+        image: Input image (RGB or grayscale)
+        template: Template image or a `Template` (reuses its cached spectrum)
+        top_k (int): Number of peaks to return
+        min_distance (int): Minimum distance between peaks (defaults to half
+            the smaller template side)
+        threshold (float): Optional minimum score of a peak
+
+    Returns:
+        tuple: (scores, peaks) where scores has shape (H - h + 1, W - w + 1)
+        and peaks is a list of (row, col, score) of the template's top-left
+        corner, best first
+    """
+    if not isinstance(template, Template):
+        template = Template(template)
+    image = to_gray(image, np.float32).astype(np.float64)
+    height, width = image.shape
+    t_height, t_width = template.shape
+    if t_height > height or t_width > width:
+        raise ValueError("Template must not be larger than the image.")
+
+    # Numerator: circular correlation is exact on the valid region for FFT sizes >= the image
+    fft_shape = (_fast_length(height), _fast_length(width))
+    correlation = np.fft.irfft2(np.fft.rfft2(image, fft_shape) * template.spectrum(fft_shape), fft_shape)
+    numerator = correlation[:height - t_height + 1, :width - t_width + 1]
+
+    # Local energy of the image under the template, from integral images of x and x^2
+    count = t_height * t_width
+    sums = _window_sums(_integral_image(image), t_height, t_width)
+    sums_sq = _window_sums(_integral_image(image ** 2), t_height, t_width)
+    local_energy = np.maximum(sums_sq - sums ** 2 / count, 0)
+
+    denominator = np.sqrt(local_energy * template.energy)
+    flat = denominator <= 1e-6 * max(template.energy, 1)
+    scores = np.where(flat, 0, numerator / np.where(flat, 1, denominator))
+    scores = np.clip(scores, -1, 1)
+
+    return scores, find_peaks(scores, top_k, min_distance or max(min(t_height, t_width) // 2, 1), threshold)
+
+
+def find_peaks(scores, top_k=1, min_distance=1, threshold=None):
+    """
+    Best local maxima of a score map with non-maximum suppression.
+
+    Candidates are the pixels equal to the maximum of their
+    (2 * min_distance + 1) window (a vectorized grey dilation); they are then
+    accepted greedily in score order, skipping any closer than `min_distance`
+    to an accepted peak.
+
+    Returns:
+        list: (row, col, score) tuples, best first
+    """
+    window = np.ones((2 * min_distance + 1, 2 * min_distance + 1), dtype=np.uint8)
+    candidates = scores >= grey_dilation(scores, window)
+    if threshold is not None:
+        candidates &= scores >= threshold
+    rows, cols = np.nonzero(candidates)
+    order = np.argsort(-scores[rows, cols], kind='stable')
+
+    peaks = []
+    for row, col in zip(rows[order], cols[order]):
+        if len(peaks) >= top_k:
+            break
+        if all(max(abs(row - r), abs(col - c)) > min_distance for r, c, _ in peaks):
+            peaks.append((int(row), int(col), float(scores[row, col])))
+    return peaks
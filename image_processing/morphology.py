@@ -15,6 +15,17 @@
 # ================================== All Libraries ==================================
 # ===================================================================================
 
+# Import utilities
+from utils.color import to_gray
+from utils.workspace import get_workspace
+from utils.precision import working_dtype
+from utils.roi import supports_roi
+from utils.batch import supports_batch
+from utils.channels import supports_channels
+from utils.channels import keeps_channels
+from utils.channels import to_planes
+from utils.channels import from_planes
+
 # Other Necessary Libraries
 import numpy as np
 
@@ -281,138 +292,897 @@ def create_custom_structuring_element(shape, *args):
 # ===================================================================================
 
 ########################################################## Morphological Operations
-def erosion(image, structuring_element):
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: max(np.shape(structuring_element)) // 2)
+@supports_channels
+def erosion(image, structuring_element, out=None, workspace=None, per_channel=False, batch=False):
     """
     Perform erosion operation on a binary image using vectorized operations.
     
     Args:
         image: Binary input image (grayscale)
         structuring_element: Structuring element for erosion
+        out: Optional output buffer
+        workspace (Workspace): Scratch buffer pool (defaults to the thread's own)
+        per_channel (bool): Threshold and process each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
     
     Returns:
         Eroded image
     """
-    # Convert to grayscale if needed
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
-    
-    # Convert to binary (0 or 1) for easier processing
-    binary_image = (image > 127).astype(np.uint8)
-    
-    # Get dimensions
-    img_height, img_width = binary_image.shape
-    se_height, se_width = structuring_element.shape
-    
-    # Calculate padding
-    pad_h = se_height // 2
-    pad_w = se_width // 2
-    
-    # Pad the image with zeros (background)
-    padded_image = np.pad(binary_image, ((pad_h, pad_h), (pad_w, pad_w)), mode='constant', constant_values=0)
-    
-    # Use sliding window view for vectorized operation
-    shape = (img_height, img_width, se_height, se_width)
-    strides = padded_image.strides + padded_image.strides
-    windows = np.lib.stride_tricks.as_strided(padded_image, shape=shape, strides=strides)
+    # Padded binary image and accumulator come from the reusable workspace
+    dtype = working_dtype(image)
+    binary_image, accumulator = _binary_windows(image, structuring_element, workspace, per_channel, batch)
+    img_height, img_width = accumulator.shape[-2:]
     
-    # Reshape structuring element for broadcasting
-    se_reshaped = structuring_element.reshape(1, 1, se_height, se_width)
-    
-    # For erosion: check if ALL positions where SE=1 have image=1
-    # Create mask where structuring element is 1
-    se_mask = (se_reshaped == 1)
-    
-    # Apply erosion condition: where SE=1, image must be 1
-    erosion_condition = np.where(se_mask, windows, 1)  # Set non-SE positions to 1 (don't affect result)
-    
-    # Check if all SE positions are satisfied
-    eroded = np.all(erosion_condition == 1, axis=(2, 3)).astype(np.uint8)
+    # For erosion: ALL positions where SE=1 must have image=1
+    accumulator.fill(True)
+    for i, j in np.argwhere(structuring_element == 1):
+        np.logical_and(accumulator, binary_image[..., i:i + img_height, j:j + img_width], out=accumulator)
     
     # Convert back to 0-255 range
-    return eroded * 255
+    if keeps_channels(image, per_channel, batch):
+        return from_planes(np.multiply(accumulator, dtype(255)), image, per_channel, out, batch)
+    return np.multiply(accumulator, dtype(255), out=out)
 
 
-def dilation(image, structuring_element):
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: max(np.shape(structuring_element)) // 2)
+@supports_channels
+def dilation(image, structuring_element, out=None, workspace=None, per_channel=False, batch=False):
     """
     Perform dilation operation on a binary image using vectorized operations.
     
     Args:
         image: Binary input image (grayscale)
         structuring_element: Structuring element for dilation
+        out: Optional output buffer
+        workspace (Workspace): Scratch buffer pool (defaults to the thread's own)
+        per_channel (bool): Threshold and process each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
     
     Returns:
         Dilated image
     """
-    # Convert to grayscale if needed
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
-    
-    # Convert to binary (0 or 1) for easier processing
-    binary_image = (image > 127).astype(np.uint8)
-    
-    # Get dimensions
-    img_height, img_width = binary_image.shape
-    se_height, se_width = structuring_element.shape
-    
-    # Calculate padding
-    pad_h = se_height // 2
-    pad_w = se_width // 2
+    # Padded binary image and accumulator come from the reusable workspace
+    dtype = working_dtype(image)
+    binary_image, accumulator = _binary_windows(image, structuring_element, workspace, per_channel, batch)
+    img_height, img_width = accumulator.shape[-2:]
     
-    # Pad the image with zeros (background)
-    padded_image = np.pad(binary_image, ((pad_h, pad_h), (pad_w, pad_w)), mode='constant', constant_values=0)
-    
-    # Use sliding window view for vectorized operation
-    shape = (img_height, img_width, se_height, se_width)
-    strides = padded_image.strides + padded_image.strides
-    windows = np.lib.stride_tricks.as_strided(padded_image, shape=shape, strides=strides)
-    
-    # Reshape structuring element for broadcasting
-    se_reshaped = structuring_element.reshape(1, 1, se_height, se_width)
-    
-    # For dilation: check if ANY position where SE=1 AND image=1
-    # Create mask where both SE=1 and image=1
-    overlap = (windows == 1) & (se_reshaped == 1)
-    
-    # Check if any SE position overlaps with foreground
-    dilated = np.any(overlap, axis=(2, 3)).astype(np.uint8)
+    # For dilation: ANY position where SE=1 AND image=1
+    accumulator.fill(False)
+    for i, j in np.argwhere(structuring_element == 1):
+        np.logical_or(accumulator, binary_image[..., i:i + img_height, j:j + img_width], out=accumulator)
     
     # Convert back to 0-255 range
-    return dilated * 255
+    if keeps_channels(image, per_channel, batch):
+        return from_planes(np.multiply(accumulator, dtype(255)), image, per_channel, out, batch)
+    return np.multiply(accumulator, dtype(255), out=out)
 
 
-def opening(image, structuring_element):
+def _binary_windows(image, structuring_element, workspace, per_channel=False, batch=False):
+    """
+    Zero-padded foreground mask of an image and an image-sized accumulator, both borrowed.
+
+    The window of output pixel (y, x) starts at (y, x) in the padded mask, so
+    SE offset (i, j) is the slice [..., i:i + height, j:j + width] (leading
+    axes are colour planes).
+    """
+    workspace = workspace or get_workspace()
+    planes = to_planes(image, working_dtype(image), per_channel, batch)
+    se_height, se_width = structuring_element.shape
+
+    # Pad the image with zeros (background), then threshold in place
+    padded_image = workspace.pad(planes, se_height // 2, se_width // 2)
+    binary_image = workspace.borrow(padded_image.shape, bool, 'binary')
+    np.greater(padded_image, 127, out=binary_image)
+    return binary_image, workspace.borrow(planes.shape, bool, 'accumulator')
+
+
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: 2 * (max(np.shape(structuring_element)) // 2))
+@supports_channels
+def opening(image, structuring_element, per_channel=False, batch=False):
     """
     Perform opening operation (erosion followed by dilation).
     
     Args:
         image: Binary input image
         structuring_element: Structuring element for opening
+        per_channel (bool): Process each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
     
     Returns:
         Opened image
     """
-    eroded = erosion(image, structuring_element)
-    opened = dilation(eroded, structuring_element)
+    eroded = erosion(image, structuring_element, per_channel=per_channel, batch=batch)
+    opened = dilation(eroded, structuring_element, per_channel=per_channel, batch=batch)
     return opened
 
 
-def closing(image, structuring_element):
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: 2 * (max(np.shape(structuring_element)) // 2))
+@supports_channels
+def closing(image, structuring_element, per_channel=False, batch=False):
     """
     Perform closing operation (dilation followed by erosion).
     
     Args:
         image: Binary input image
         structuring_element: Structuring element for closing
+        per_channel (bool): Process each colour channel instead of the grayscale image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
     
     Returns:
         Closed image
     """
-    dilated = dilation(image, structuring_element)
-    closed = erosion(dilated, structuring_element)
+    dilated = dilation(image, structuring_element, per_channel=per_channel, batch=batch)
+    closed = erosion(dilated, structuring_element, per_channel=per_channel, batch=batch)
     return closed
+
+
+# ================================== Reconstruction =================================
+# ===================================================================================
+
+########################################################## Helpers
+def _to_binary(image):
+    """
+    Convert an input image to a boolean foreground mask (gray > 127).
+
+    Args:
+        image: Input image (RGB or grayscale)
+
+    Returns:
+        Boolean mask
+    """
+    return to_gray(image, working_dtype(image)) > 127
+
+
+def _neighbour_offsets(padded_width, connectivity):
+    """
+    Flat index offsets of the neighbours of a pixel in a padded, raveled image.
+
+    Args:
+        padded_width (int): Width of the padded image.
+        connectivity (int): 4 or 8.
+
+    Returns:
+        numpy.ndarray: Offsets to add to a flat index.
+    """
+    if connectivity == 4:
+        return np.array([-padded_width, -1, 1, padded_width])
+    elif connectivity == 8:
+        return np.array([-padded_width - 1, -padded_width, -padded_width + 1, -1,
+                         1, padded_width - 1, padded_width, padded_width + 1])
+    raise ValueError("Invalid connectivity. Supported values are 4 or 8.")
+
+
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: max(np.shape(structuring_element)) // 2)
+@supports_channels
+def grey_erosion(image, structuring_element, per_channel=False, batch=False):
+    """
+    Grayscale erosion (minimum over the structuring element).
+
+    The minimum is accumulated one structuring element offset at a time on
+    shifted views, so memory stays at two image-sized buffers.
+
+    Args:
+        image: Grayscale input image
+        structuring_element: Structuring element (non-zero = active)
+        per_channel (bool): Process each channel of a colour image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
+
+    Returns:
+        Eroded image (same dtype as input)
+    """
+    planes = _grey_planes(image, per_channel, batch)
+    height, width = planes.shape[-2:]
+    se_height, se_width = structuring_element.shape
+    pad_h, pad_w = se_height // 2, se_width // 2
+    fill = np.iinfo(planes.dtype).max if np.issubdtype(planes.dtype, np.integer) else np.inf
+    padded = np.pad(planes, ((0, 0),) * (planes.ndim - 2) + ((pad_h, pad_h), (pad_w, pad_w)),
+                    mode='constant', constant_values=fill)
+    out = np.full(planes.shape, fill, dtype=planes.dtype)
+    for dy, dx in zip(*np.nonzero(structuring_element)):
+        np.minimum(out, padded[..., dy:dy + height, dx:dx + width], out=out)
+    return from_planes(out, image, per_channel, batch=batch)
+
+
+@supports_batch(vectorized=True)
+@supports_roi(lambda structuring_element, *_, **__: max(np.shape(structuring_element)) // 2)
+@supports_channels
+def grey_dilation(image, structuring_element, per_channel=False, batch=False):
+    """
+    Grayscale dilation (maximum over the reflected structuring element).
+
+    Args:
+        image: Grayscale input image
+        structuring_element: Structuring element (non-zero = active)
+        per_channel (bool): Process each channel of a colour image
+        batch (bool): The first axis is a stack of frames (see utils.batch)
+
+    Returns:
+        Dilated image (same dtype as input)
+    """
+    planes = _grey_planes(image, per_channel, batch)
+    height, width = planes.shape[-2:]
+    se = structuring_element[::-1, ::-1]
+    se_height, se_width = se.shape
+    pad_h, pad_w = se_height // 2, se_width // 2
+    fill = np.iinfo(planes.dtype).min if np.issubdtype(planes.dtype, np.integer) else -np.inf
+    # Pad so that the reflected element stays centred for even sizes too
+    padded = np.pad(planes, ((0, 0),) * (planes.ndim - 2) + ((se_height - 1 - pad_h, pad_h), (se_width - 1 - pad_w, pad_w)),
+                    mode='constant', constant_values=fill)
+    out = np.full(planes.shape, fill, dtype=planes.dtype)
+    for dy, dx in zip(*np.nonzero(se)):
+        np.maximum(out, padded[..., dy:dy + height, dx:dx + width], out=out)
+    return from_planes(out, image, per_channel, batch=batch)
+
+
+def _grey_planes(image, per_channel, batch=False):
+    """The image itself, or a (C, H, W) view of its channels (grey operations keep the input dtype)."""
+    image = np.asarray(image)
+    return np.moveaxis(image, -1, int(batch)) if keeps_channels(image, per_channel, batch) else image
+
+
+########################################################## Reconstruction (Vincent FIFO)
+def reconstruction_by_dilation(marker, mask, connectivity=8):
+    """
+    Morphological reconstruction by dilation of `marker` under `mask`.
+
+    Queue-based propagation after Vincent (1993): only pixels whose value
+    changed are placed in the FIFO and only their neighbours are examined.
+    The FIFO is drained one wavefront at a time with vectorized numpy
+    operations instead of one pixel at a time. A pixel re-enters the queue
+    only when its value strictly increases, so it is processed at most once
+    for binary images and at most once per grey level otherwise.
+
+    Args:
+        marker: Marker image (same shape as mask), clipped to the mask
+        mask: Mask image
+        connectivity (int): 4 or 8
+
+    Returns:
+        Reconstructed image (dtype of mask)
+    """
+    mask = np.asarray(mask)
+    marker = np.minimum(np.asarray(marker).astype(mask.dtype), mask)
+    height, width = mask.shape
+
+    # One pixel of padding at the mask minimum; nothing can propagate into it
+    floor = mask.min() if mask.size else 0
+    padded_mask = np.pad(mask, 1, mode='constant', constant_values=floor).ravel()
+    rec = np.pad(marker, 1, mode='constant', constant_values=floor).ravel()
+    offsets = _neighbour_offsets(width + 2, connectivity)
+
+    # Initial queue: pixels which can raise at least one of their neighbours
+    inner = (np.arange(1, height + 1)[:, None] * (width + 2) + np.arange(1, width + 1)).ravel()
+    can_grow = np.zeros(inner.shape, dtype=bool)
+    for offset in offsets:
+        neighbour = inner + offset
+        can_grow |= np.minimum(rec[inner], padded_mask[neighbour]) > rec[neighbour]
+    queue = inner[can_grow]
+
+    # Drain the FIFO wavefront by wavefront
+    while queue.size:
+        values = rec[queue]
+        changed = []
+        for offset in offsets:
+            neighbour = queue + offset
+            candidate = np.minimum(values, padded_mask[neighbour])
+            grow = candidate > rec[neighbour]
+            if grow.any():
+                neighbour = neighbour[grow]
+                np.maximum.at(rec, neighbour, candidate[grow])
+                changed.append(neighbour)
+        queue = np.unique(np.concatenate(changed)) if changed else queue[:0]
+
+    return rec.reshape(height + 2, width + 2)[1:-1, 1:-1]
+
+
+def reconstruction_by_erosion(marker, mask, connectivity=8):
+    """
+    Morphological reconstruction by erosion of `marker` over `mask`.
+
+    Computed as the dual of reconstruction by dilation on inverted images.
+
+    Args:
+        marker: Marker image (same shape as mask), clipped from below by the mask
+        mask: Mask image
+        connectivity (int): 4 or 8
+
+    Returns:
+        Reconstructed image (dtype of mask)
+    """
+    mask = np.asarray(mask)
+    marker = np.asarray(marker).astype(mask.dtype)
+    top = max(marker.max(), mask.max())
+    rec = reconstruction_by_dilation(top - marker, top - mask, connectivity)
+    return (top - rec).astype(mask.dtype)
+
+
+########################################################## Hole filling & border clearing
+@supports_batch()
+@supports_roi()
+def fill_holes(image, connectivity=4):
+    """
+    Fill holes in a binary image.
+
+    Background connected to the image border is reconstructed from the
+    border; every other background pixel is a hole and becomes foreground.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        connectivity (int): Connectivity of the background (4 or 8)
+
+    Returns:
+        Filled image (0 / 255)
+    """
+    foreground = _to_binary(image)
+    background = (~foreground).astype(np.uint8)
+
+    # Marker = background pixels on the border
+    marker = np.zeros_like(background)
+    marker[0, :], marker[-1, :] = background[0, :], background[-1, :]
+    marker[:, 0], marker[:, -1] = background[:, 0], background[:, -1]
+
+    outside = reconstruction_by_dilation(marker, background, connectivity)
+    return (outside == 0).astype(working_dtype(image)) * 255
+
+
+@supports_batch()
+@supports_roi()
+def clear_border(image, connectivity=8):
+    """
+    Remove foreground objects that touch the image border.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        connectivity (int): Connectivity of the foreground (4 or 8)
+
+    Returns:
+        Cleared image (0 / 255)
+    """
+    foreground = _to_binary(image).astype(np.uint8)
+
+    marker = np.zeros_like(foreground)
+    marker[0, :], marker[-1, :] = foreground[0, :], foreground[-1, :]
+    marker[:, 0], marker[:, -1] = foreground[:, 0], foreground[:, -1]
+
+    touching = reconstruction_by_dilation(marker, foreground, connectivity)
+    return (foreground & (touching == 0)).astype(working_dtype(image)) * 255
+
+
+########################################################## Top-hat family & h-maxima
+@supports_batch()
+@supports_roi()
+def opening_by_reconstruction(image, structuring_element, connectivity=8):
+    """
+    Grayscale opening by reconstruction: erode, then reconstruct by dilation.
+
+    Unlike a plain opening, objects that survive the erosion keep their exact shape.
+
+    Args:
+        image: Input image (grayscale or RGB)
+        structuring_element: Structuring element for the erosion
+        connectivity (int): 4 or 8
+
+    Returns:
+        Opened image (uint8, or float32 for float input)
+    """
+    gray = to_gray(image, working_dtype(image))
+    return reconstruction_by_dilation(grey_erosion(gray, structuring_element), gray, connectivity)
+
+
+@supports_batch()
+@supports_roi()
+def closing_by_reconstruction(image, structuring_element, connectivity=8):
+    """
+    Grayscale closing by reconstruction: dilate, then reconstruct by erosion.
+
+    Args:
+        image: Input image (grayscale or RGB)
+        structuring_element: Structuring element for the dilation
+        connectivity (int): 4 or 8
+
+    Returns:
+        Closed image (uint8, or float32 for float input)
+    """
+    gray = to_gray(image, working_dtype(image))
+    return reconstruction_by_erosion(grey_dilation(gray, structuring_element), gray, connectivity)
+
+
+@supports_batch()
+@supports_roi()
+def top_hat(image, structuring_element, connectivity=8):
+    """
+    White top-hat by reconstruction: image minus its opening by reconstruction.
+
+    Extracts bright details smaller than the structuring element.
+
+    Args:
+        image: Input image (grayscale or RGB)
+        structuring_element: Structuring element
+        connectivity (int): 4 or 8
+
+    Returns:
+        Top-hat image (uint8, or float32 for float input)
+    """
+    gray = to_gray(image, working_dtype(image))
+    return gray - opening_by_reconstruction(gray, structuring_element, connectivity)
+
+
+@supports_batch()
+@supports_roi()
+def black_hat(image, structuring_element, connectivity=8):
+    """
+    Black top-hat by reconstruction: closing by reconstruction minus image.
+
+    Extracts dark details smaller than the structuring element.
+
+    Args:
+        image: Input image (grayscale or RGB)
+        structuring_element: Structuring element
+        connectivity (int): 4 or 8
+
+    Returns:
+        Black-hat image (uint8, or float32 for float input)
+    """
+    gray = to_gray(image, working_dtype(image))
+    return closing_by_reconstruction(gray, structuring_element, connectivity) - gray
+
+
+@supports_batch()
+@supports_roi()
+def h_maxima(image, h, connectivity=8):
+    """
+    Extended maxima: regional maxima of the h-maxima transform.
+
+    The h-maxima transform reconstructs (image - h) under the image, which
+    removes every maximum whose dynamic is below `h`; the regional maxima
+    of the result mark the surviving peaks. A flat image, or one whose
+    range does not exceed `h`, has none.
+
+    Args:
+        image: Input image (grayscale or RGB)
+        h (int): Minimum height of a maximum
+        connectivity (int): 4 or 8
+
+    Returns:
+        Binary image of the maxima (0 / 255)
+    """
+    gray = to_gray(image).astype(np.int32)
+    hmax = reconstruction_by_dilation(np.maximum(gray - h, 0), gray, connectivity)
+    if hmax.min() == hmax.max():
+        # Every maximum was removed: a constant transform is one plateau with no lower
+        # neighbour, which is not a maximum
+        return np.zeros(gray.shape, dtype=working_dtype(image))
+
+    # Regional maxima of hmax: plateaus that do not survive lowering by one
+    lowered = reconstruction_by_dilation(hmax - 1, hmax, connectivity)
+    return ((hmax - lowered) > 0).astype(working_dtype(image)) * 255
+
+
+# ============================ Connected-Component Labeling =========================
+# ===================================================================================
+
+########################################################## Two-pass union-find labeling
+def _find_roots(parent):
+    """
+    Resolve every entry of a union-find parent array to its root (pointer jumping).
+
+    Args:
+        parent (numpy.ndarray): Parent array, modified in place
+
+    Returns:
+        numpy.ndarray: The compressed parent array
+    """
+    while True:
+        grandparent = parent[parent]
+        if np.array_equal(grandparent, parent):
+            return parent
+        parent[:] = grandparent
+
+
+def merge_equivalences(num_labels, first, second):
+    """
+    Merge label equivalences with a vectorized union-find.
+
+    Every pair hooks the larger of its two roots onto the smaller one, then
+    pointer jumping flattens the trees; this repeats until all pairs share a
+    root.
+
+    Args:
+        num_labels (int): Number of provisional labels (1..num_labels, 0 = background)
+        first, second (numpy.ndarray): Equivalent label pairs
+
+    Returns:
+        tuple: (lut, num_merged) where lut maps every provisional label to a
+        consecutive final label (lut[0] == 0)
+    """
+    parent = np.arange(num_labels + 1, dtype=np.int32)
+    first, second = np.asarray(first), np.asarray(second)
+    while first.size:
+        root_a = parent[first]
+        root_b = parent[second]
+        low = np.minimum(root_a, root_b)
+        high = np.maximum(root_a, root_b)
+        pending = low != high
+        if not pending.any():
+            break
+        np.minimum.at(parent, high[pending], low[pending])
+        _find_roots(parent)
+        first, second = first[pending], second[pending]
+
+    roots, lut = np.unique(parent, return_inverse=True)
+    return lut.astype(np.int32), len(roots) - 1
+
+
+@supports_batch()
+def label_components(image, connectivity=8):
+    """
+    Label the connected components of a binary image.
+
+    Two-pass labeling with union-find. The first pass gives every horizontal
+    run of foreground pixels a provisional label and records the equivalences
+    between runs that touch across consecutive rows. The equivalences are
+    merged with a vectorized union-find (hooking onto the smaller root plus
+    pointer jumping), and the second pass maps provisional labels to
+    consecutive final labels through a single lookup table.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        connectivity (int): 4 or 8
+
+    Returns:
+        tuple: (labels, num_labels) where labels is an int32 image with 0 as
+        background and 1..num_labels for the components
+    """
+    if connectivity not in (4, 8):
+        raise ValueError("Invalid connectivity. Supported values are 4 or 8.")
+    foreground = _to_binary(image) if image.dtype != bool else image
+    height, width = foreground.shape
+
+    # First pass: provisional label per horizontal run
+    run_start = foreground.copy()
+    run_start[:, 1:] &= ~foreground[:, :-1]
+    provisional = np.cumsum(run_start.ravel(), dtype=np.int32).reshape(height, width)
+    provisional[~foreground] = 0
+    num_runs = int(provisional.max()) if provisional.size else 0
+
+    # Equivalences between runs on consecutive rows
+    below, above = provisional[1:], provisional[:-1]
+    pairs = [(below[:, :], above[:, :])]
+    if connectivity == 8:
+        pairs.append((below[:, 1:], above[:, :-1]))
+        pairs.append((below[:, :-1], above[:, 1:]))
+    first = np.concatenate([b[(b > 0) & (a > 0)] for b, a in pairs])
+    second = np.concatenate([a[(b > 0) & (a > 0)] for b, a in pairs])
+
+    # Union-find over the run equivalences, then consecutive labels through a lookup table
+    lut, num_labels = merge_equivalences(num_runs, first, second)
+    return lut[provisional], num_labels
+
+
+########################################################## Region properties
+def region_properties(labels, num_labels=None):
+    """
+    Area, bounding box and centroid of every label, computed in one pass each.
+
+    Args:
+        labels: Label image (0 = background)
+        num_labels (int): Number of labels (defaults to labels.max())
+
+    Returns:
+        dict: Arrays indexed by label (index 0 is the background):
+            'area'     (num_labels + 1,)    pixel count
+            'bbox'     (num_labels + 1, 4)  min_row, min_col, max_row + 1, max_col + 1
+            'centroid' (num_labels + 1, 2)  row, col
+    """
+    if num_labels is None:
+        num_labels = int(labels.max()) if labels.size else 0
+    height, width = labels.shape
+    flat = labels.ravel()
+    rows, cols = np.divmod(np.arange(flat.size), width)
+
+    area = np.bincount(flat, minlength=num_labels + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroid = np.stack([np.bincount(flat, weights=rows, minlength=num_labels + 1),
+                             np.bincount(flat, weights=cols, minlength=num_labels + 1)], axis=1) / area[:, None]
+
+    bbox = np.empty((num_labels + 1, 4), dtype=np.int64)
+    bbox[:, :2] = np.iinfo(np.int64).max
+    bbox[:, 2:] = -1
+    np.minimum.at(bbox[:, 0], flat, rows)
+    np.minimum.at(bbox[:, 1], flat, cols)
+    np.maximum.at(bbox[:, 2], flat, rows + 1)
+    np.maximum.at(bbox[:, 3], flat, cols + 1)
+
+    return {'area': area, 'bbox': bbox, 'centroid': centroid}
+
+
+@supports_batch()
+@supports_roi()
+def remove_small_objects(image, min_area, connectivity=8):
+    """
+    Keep only the connected components whose area exceeds `min_area`.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        min_area (int): Minimum area (exclusive) of a kept component
+        connectivity (int): 4 or 8
+
+    Returns:
+        Filtered image (0 / 255)
+    """
+    labels, num_labels = label_components(image, connectivity)
+    area = np.bincount(labels.ravel(), minlength=num_labels + 1)
+
+    # Area filter as a single LUT lookup on the label image
+    keep = np.where(area > min_area, 255, 0).astype(working_dtype(image))
+    keep[0] = 0
+    return keep[labels]
+
+
+# =================================== Thinning ======================================
+# ===================================================================================
+
+########################################################## Neighbourhood codes & LUTs
+def _neighbourhood_bits(codes):
+    """
+    Split 8-bit neighbourhood codes into the neighbours P2..P9.
+
+    Bit i of a code holds neighbour P(i + 2), clockwise from north:
+    P2 = N, P3 = NE, P4 = E, P5 = SE, P6 = S, P7 = SW, P8 = W, P9 = NW.
+
+    Args:
+        codes (numpy.ndarray): Neighbourhood codes
+
+    Returns:
+        list: Eight boolean arrays P2..P9
+    """
+    return [((codes >> i) & 1).astype(bool) for i in range(8)]
+
+
+def _zhang_suen_luts():
+    """
+    Deletion tables of the two Zhang-Suen sub-iterations, indexed by neighbourhood code.
+
+    Returns:
+        tuple: Two boolean arrays of 256 entries
+    """
+    p2, p3, p4, p5, p6, p7, p8, p9 = _neighbourhood_bits(np.arange(256))
+    ring = np.stack([p2, p3, p4, p5, p6, p7, p8, p9, p2]).astype(np.int8)
+
+    count = ring[:-1].sum(axis=0)                             # B(P1)
+    transitions = ((ring[:-1] == 0) & (ring[1:] == 1)).sum(axis=0)  # A(P1)
+    base = (count >= 2) & (count <= 6) & (transitions == 1)
+
+    first = base & ~(p2 & p4 & p6) & ~(p4 & p6 & p8)
+    second = base & ~(p2 & p4 & p8) & ~(p2 & p6 & p8)
+    return first, second
+
+
+def _guo_hall_luts():
+    """
+    Deletion tables of the two Guo-Hall sub-iterations, indexed by neighbourhood code.
+
+    Returns:
+        tuple: Two boolean arrays of 256 entries
+    """
+    p2, p3, p4, p5, p6, p7, p8, p9 = _neighbourhood_bits(np.arange(256))
+
+    connectivity = ((~p2 & (p3 | p4)).astype(int) + (~p4 & (p5 | p6)) +
+                    (~p6 & (p7 | p8)) + (~p8 & (p9 | p2)))
+    n1 = (p9 | p2).astype(int) + (p3 | p4) + (p5 | p6) + (p7 | p8)
+    n2 = (p2 | p3).astype(int) + (p4 | p5) + (p6 | p7) + (p8 | p9)
+    n = np.minimum(n1, n2)
+    base = (connectivity == 1) & (n >= 2) & (n <= 3)
+
+    first = base & ~((p6 | p7 | ~p9) & p8)
+    second = base & ~((p2 | p3 | ~p5) & p4)
+    return first, second
+
+
+THINNING_LUTS = {
+    'zhang_suen': _zhang_suen_luts(),
+    'guo_hall': _guo_hall_luts(),
+}
+
+
+########################################################## Skeletonization
+@supports_batch()
+@supports_roi()
+def skeletonize(image, method='zhang_suen'):
+    """
+    Thin a binary image to a one pixel wide skeleton.
+
+    Each candidate pixel's 3x3 neighbourhood is encoded as an 8-bit code with
+    vectorized shifts and the deletion decision is a lookup in a precomputed
+    256-entry table. Only pixels on the current boundary (foreground pixels
+    with a background neighbour) are examined; after each sub-iteration the
+    boundary is updated with the foreground neighbours of the deleted pixels.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        method (str): 'zhang_suen' or 'guo_hall'
+
+    Returns:
+        Skeleton image (0 / 255)
+    """
+    method = method.lower().replace('-', '_')
+    if method not in THINNING_LUTS:
+        raise ValueError("Invalid method. Supported methods are: 'zhang_suen', 'guo_hall'.")
+    luts = THINNING_LUTS[method]
+
+    foreground = _to_binary(image)
+    height, width = foreground.shape
+    padded = np.pad(foreground, 1, mode='constant').ravel().astype(np.uint8)
+
+    # Neighbour offsets in the order P2..P9 (N, NE, E, SE, S, SW, W, NW)
+    w = width + 2
+    offsets = np.array([-w, -w + 1, 1, w + 1, w, w - 1, -1, -w - 1])
+
+    # Initial boundary: foreground pixels with at least one background neighbour
+    pixels = np.flatnonzero(padded)
+    on_boundary = np.zeros(pixels.shape, dtype=bool)
+    for offset in offsets:
+        on_boundary |= padded[pixels + offset] == 0
+    boundary = pixels[on_boundary]
+
+    while boundary.size:
+        deleted_any = False
+        for lut in luts:
+            codes = np.zeros(boundary.shape, dtype=np.uint8)
+            for bit, offset in enumerate(offsets):
+                codes |= padded[boundary + offset] << bit
+
+            delete = lut[codes]
+            if not delete.any():
+                continue
+            deleted_any = True
+            removed = boundary[delete]
+            padded[removed] = 0
+
+            # New boundary: surviving boundary pixels plus foreground neighbours of removed ones
+            neighbours = (removed[:, None] + offsets).ravel()
+            boundary = np.concatenate([boundary[~delete], neighbours[padded[neighbours] == 1]])
+            boundary = np.unique(boundary)
+        if not deleted_any:
+            break
+
+    return padded.reshape(height + 2, width + 2)[1:-1, 1:-1].astype(working_dtype(image)) * 255
+
+
+# ================================== Hit-or-Miss ====================================
+# ===================================================================================
+
+########################################################## Packed-row helpers
+def _shift_packed(packed, dy, dx):
+    """
+    Shift a bit-packed binary image so that result[y, x] = image[y + dy, x + dx].
+
+    Rows are packed 8 pixels per byte (most significant bit first, as
+    np.packbits does); pixels shifted in from outside the image are 0.
+
+    Args:
+        packed (numpy.ndarray): Packed image of shape (height, ceil(width / 8))
+        dy (int): Vertical offset
+        dx (int): Horizontal offset
+
+    Returns:
+        numpy.ndarray: Shifted packed image
+    """
+    height, num_bytes = packed.shape
+    out = np.zeros_like(packed)
+
+    # Vertical shift: whole rows
+    if abs(dy) >= height:
+        return out
+    src = packed[max(dy, 0):height + min(dy, 0)]
+    rows = slice(max(-dy, 0), height + min(-dy, 0))
+
+    # Horizontal shift: whole bytes then the remaining bits
+    q, r = divmod(abs(dx), 8)
+    padded = np.zeros((src.shape[0], num_bytes + q + 1), dtype=np.uint8)
+    if dx >= 0:
+        padded[:, :num_bytes] = src
+        head, tail = padded[:, q:q + num_bytes], padded[:, q + 1:q + 1 + num_bytes]
+        out[rows] = (head << r) | (tail >> (8 - r)) if r else head
+    else:
+        padded[:, q + 1:] = src
+        head, tail = padded[:, 1:1 + num_bytes], padded[:, :num_bytes]
+        out[rows] = (head >> r) | (tail << (8 - r)) if r else head
+    return out
+
+
+########################################################## Templates
+def template_rotations(template):
+    """
+    The four 90 degree rotations of a hit-or-miss template.
+
+    Args:
+        template: 2-D template (1 = foreground, -1 = background, 0 = don't care)
+
+    Returns:
+        list: Four rotated templates
+    """
+    template = np.asarray(template)
+    return [np.rot90(template, k) for k in range(4)]
+
+
+# Skeleton endpoints: exactly one foreground neighbour
+ENDPOINT_TEMPLATES = template_rotations([[-1, 1, -1],
+                                         [-1, 1, -1],
+                                         [-1, -1, -1]]) + \
+                     template_rotations([[-1, -1, 1],
+                                         [-1, 1, -1],
+                                         [-1, -1, -1]])
+
+# Skeleton junctions: T, Y and diagonal branch configurations
+JUNCTION_TEMPLATES = template_rotations([[0, 1, 0],
+                                         [1, 1, 1],
+                                         [0, 0, 0]]) + \
+                     template_rotations([[1, 0, 1],
+                                         [0, 1, 0],
+                                         [0, 1, 0]]) + \
+                     template_rotations([[1, 0, 1],
+                                         [0, 1, 0],
+                                         [1, 0, 0]])
+
+
+########################################################## Hit-or-miss transform
+@supports_batch()
+def hit_or_miss(image, templates, combine=True):
+    """
+    Hit-or-miss transform with one or several templates.
+
+    Template convention follows OpenCV: 1 = must be foreground, -1 = must be
+    background, 0 = don't care. The image is bit-packed along the rows so a
+    single byte operation evaluates 8 pixels; each template is the bitwise
+    AND of shifted packed planes (NOT for background positions). Shifted
+    planes are shared between all templates of the call.
+
+    Args:
+        image: Binary input image (grayscale or RGB, > 127 is foreground)
+        templates: A single 2-D template or a list of templates
+        combine (bool): For a list of templates, return the union of the
+            matches (True) or one result per template (False)
+
+    Returns:
+        Match image (0 / 255), or an array of shape (n_templates, H, W)
+    """
+    # A single template is a sequence of rows; a bank may mix template sizes
+    single = np.ndim(templates[0]) == 1
+    if single:
+        templates = [templates]
+    templates = [np.asarray(t) for t in templates]
+
+    foreground = _to_binary(image)
+    height, width = foreground.shape
+    packed = np.packbits(foreground, axis=1)
+
+    shifted = {}
+    def plane(dy, dx):
+        if (dy, dx) not in shifted:
+            shifted[(dy, dx)] = _shift_packed(packed, dy, dx)
+        return shifted[(dy, dx)]
+
+    results = []
+    for template in templates:
+        t_height, t_width = template.shape
+        cy, cx = t_height // 2, t_width // 2
+        match = np.full(packed.shape, 0xFF, dtype=np.uint8)
+        for (ty, tx), value in np.ndenumerate(template):
+            if value > 0:
+                match &= plane(ty - cy, tx - cx)
+            elif value < 0:
+                match &= ~plane(ty - cy, tx - cx)
+        results.append(match)
+
+    if combine or single:
+        union = np.bitwise_or.reduce(results, axis=0)
+        return np.unpackbits(union, axis=1, count=width).astype(working_dtype(image)) * 255
+    return np.stack([np.unpackbits(match, axis=1, count=width).astype(working_dtype(image)) * 255
+                     for match in results])
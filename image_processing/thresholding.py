@@ -15,8 +15,16 @@
 # ================================== All Libraries ==================================
 # ===================================================================================
 
-# Numpy Sliding Tricks
-from numpy.lib.stride_tricks import as_strided
+# Import utilities
+from utils.workspace import get_workspace
+from utils.workspace import box_sum
+from utils.precision import working_dtype
+from utils.roi import supports_roi
+from utils.batch import supports_batch
+from utils.channels import supports_channels
+from utils.channels import keeps_channels
+from utils.channels import to_planes
+from utils.channels import from_planes
 
 # Other Necessary Libraries
 import numpy as np
@@ -26,14 +34,31 @@ import numpy as np
 
 ########################################################## THRESHOLDING
 ########################################################## BINARY_OTSU
-def Binary_OTSU(image):
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
+@supports_batch(vectorized=True)
+@supports_roi()
+@supports_channels
+def Binary_OTSU(image, per_channel=False, batch=False):
+    dtype = working_dtype(image)
+    planes = to_planes(image, dtype, per_channel, batch)
+
+    # One threshold per plane (a single one for grayscale), broadcast over its pixels
+    if planes.ndim == 2:
+        threshold = otsu_threshold(planes)
     else:
-        image = image.astype(np.uint8)
+        stack = planes.reshape((-1,) + planes.shape[-2:])
+        threshold = np.array([otsu_threshold(plane) for plane in stack]).reshape(planes.shape[:-2] + (1, 1))
+    print("Otsu's algorithm implementation thresholding result: ", threshold)
+    binary_image = np.where(planes > threshold, 255, 0).astype(dtype)
+    return from_planes(binary_image, image, per_channel, batch=batch)
+
 
+def otsu_threshold(image):
+    """
+    Otsu threshold of one plane (bin centre maximizing the between-class variance).
+
+    Binary_OTSU applies it (and reports it); library code that only needs
+    the threshold calls this directly, without console output.
+    """
     # Set total number of bins in the histogram
     bins_num = 256
     is_normalized = True
@@ -62,42 +87,44 @@ def Binary_OTSU(image):
     # Maximize the inter_class_variance function val
     index_of_max_val = np.argmax(inter_class_variance)
 
-    threshold = bin_mids[:-1][index_of_max_val]
-    print("Otsu's algorithm implementation thresholding result: ", threshold)
-    binary_image = np.where(image > threshold, 255, 0).astype(np.uint8)
-    return binary_image
+    return bin_mids[:-1][index_of_max_val]
 
 ########################################################## Adaptive Thresholding
-def adaptive_thresholding(image, block_size = 3, C = 2):
-    if len(image.shape) == 3 and image.shape[2] == 3:
-        # Assuming the image is RGB, convert it to grayscale
-        image = np.dot(image[...,:3], [0.2989, 0.5870, 0.1140])
-        image = image.astype(np.uint8)
-    else:
-        image = image.astype(np.uint8)
+@supports_batch(vectorized=True)
+@supports_roi(lambda block_size=3, *_, **__: block_size // 2)
+@supports_channels
+def adaptive_thresholding(image, block_size = 3, C = 2, out=None, workspace=None, per_channel=False, batch=False):
+    workspace = workspace or get_workspace()
+    dtype = working_dtype(image)
+    planes = to_planes(image, dtype, per_channel, batch)
     
     # Ensure the block size is odd
     if block_size % 2 == 0:
         block_size += 1
 
-    # Compute the shape and strides
+    # Reflect-padded copy in a reusable buffer (borders written in place)
     pad_size = block_size // 2
-    padded_image = np.pad(image, pad_size, mode='reflect')
-    shape = (image.shape[0], image.shape[1], block_size, block_size)
-    strides = padded_image.strides[:2] + padded_image.strides[:2]
-    
-    # Create a strided array of local blocks
-    local_blocks = as_strided(padded_image, shape=shape, strides=strides)
-    local_means = local_blocks.mean(axis=(2, 3))
+    padded_image = workspace.pad(planes, pad_size, mode='reflect')
 
-    # Apply the thresholding
-    thresholded_image = np.where(image > local_means - C, 255, 0).astype(np.uint8)
+    # Local means from separable running sums
+    local_sums = box_sum(padded_image, block_size, block_size, workspace,
+                         dtype=np.int32 if dtype == np.uint8 else np.float64)
+    local_means = workspace.borrow(planes.shape, np.float64, 'means')
+    np.divide(local_sums, block_size * block_size, out=local_means)
+    local_means -= C
 
-    return thresholded_image
+    # Apply the thresholding
+    thresholded = out if out is not None and not keeps_channels(image, per_channel, batch) else np.empty(planes.shape, dtype=dtype)
+    mask = workspace.borrow(planes.shape, bool, 'mask')
+    np.greater(planes, local_means, out=mask)
+    np.multiply(mask, dtype(255), out=thresholded)
+    return from_planes(thresholded, image, per_channel, out, batch)
 
 ########################################################## Simple Thresholding
-def simple_thresholding(image, threshold):
-    # Apply simple thresholding
+@supports_batch(vectorized=True)
+@supports_roi()
+def simple_thresholding(image, threshold, batch=False):
+    # Apply simple thresholding (element-wise, so a stack of frames needs nothing else)
     thresholded_image = np.where(image > threshold, 255, 0)
     
-    return thresholded_image.astype(np.uint8)
+    return thresholded_image.astype(working_dtype(image))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from image_processing.gradient import gradient_magnitude
+from image_processing.gradient import image_gradients
+from utils.color import to_gray
+
+
+def _image():
+    return np.random.default_rng(0).integers(0, 256, (40, 50, 3)).astype(np.uint8)
+
+
+def test_to_gray_sees_in_place_edits():
+    image = _image()
+    to_gray(image)
+    image[5:15] = 0
+    assert np.array_equal(to_gray(image), to_gray(image.copy()))
+
+
+def test_to_gray_sees_edits_through_views():
+    image = _image()
+    to_gray(image)
+    image[::2, ::3] = 255
+    assert np.array_equal(to_gray(image), to_gray(image.copy()))
+
+
+def test_gradients_see_in_place_edits():
+    image = _image()
+    gradient_magnitude(image)
+    image[:, 10:20] = 128
+    assert np.array_equal(gradient_magnitude(image), gradient_magnitude(image.copy()))
+
+
+def test_cached_gradients_are_read_only():
+    gx, gy = image_gradients(_image())
+    with pytest.raises(ValueError):
+        gx[0, 0] = 1
+    with pytest.raises(ValueError):
+        gradient_magnitude(_image())[0, 0] = 1
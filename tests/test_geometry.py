@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from image_processing.geometry import rotation_matrix
+from image_processing.geometry import warp_affine
+
+
+def _image():
+    return np.random.default_rng(2).integers(0, 256, (30, 40, 3)).astype(np.uint8)
+
+
+@pytest.mark.parametrize('interpolation', ['nearest', 'bilinear', 'bicubic'])
+def test_warp_affine_into_non_contiguous_out(interpolation):
+    image = _image()
+    matrix = rotation_matrix(17, (20, 15))
+    expected = warp_affine(image, matrix, interpolation=interpolation)
+
+    canvas = np.zeros((30, 40, 4), dtype=np.uint8)
+    result = warp_affine(image, matrix, interpolation=interpolation, out=canvas[..., :3], band_rows=7)
+    assert np.array_equal(result, expected)
+    assert np.array_equal(canvas[..., :3], expected)
+
+    transposed = np.zeros((40, 30, 3), dtype=np.uint8).transpose(1, 0, 2)
+    warp_affine(image, matrix, interpolation=interpolation, out=transposed)
+    assert np.array_equal(transposed, expected)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from image_processing.hough import hough_lines
+
+
+def _edges():
+    image = np.zeros((64, 64), dtype=np.uint8)
+    image[20, 2:60] = 255
+    image[5:60, 40] = 255
+    return image
+
+
+def _counting_bincount(monkeypatch):
+    calls = []
+    bincount = np.bincount
+
+    def counted(*args, **kwargs):
+        calls.append(1)
+        return bincount(*args, **kwargs)
+
+    monkeypatch.setattr(np, 'bincount', counted)
+    return calls
+
+
+def test_vote_chunk_splits_the_votes(monkeypatch):
+    image = _edges()
+    whole, _, _ = hough_lines(image)
+    calls = _counting_bincount(monkeypatch)
+    chunked, _, _ = hough_lines(image, vote_chunk=10 * 180)
+    points = np.count_nonzero(image)
+    assert len(calls) == -(-points // 10)
+    assert np.array_equal(chunked, whole)
+
+
+def test_vote_chunk_counts_votes_not_points(monkeypatch):
+    calls = _counting_bincount(monkeypatch)
+    hough_lines(_edges(), num_angles=720, vote_chunk=720 * 16)
+    assert len(calls) == -(-np.count_nonzero(_edges()) // 16)
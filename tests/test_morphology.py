@@ -0,0 +1,54 @@
+import numpy as np
+
+from image_processing.morphology import h_maxima
+from image_processing.morphology import hit_or_miss
+
+
+def _image():
+    image = np.zeros((12, 16), dtype=np.uint8)
+    image[3, 4] = 255
+    image[6:9, 9:12] = 255
+    return image
+
+
+ISOLATED = [[-1, -1, -1], [-1, 1, -1], [-1, -1, -1]]
+CORNER = [[-1, -1, 0, 0, 0], [-1, 1, 1, 0, 0], [0, 1, 1, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 0, 0]]
+
+
+def test_hit_or_miss_single_template():
+    for template in (ISOLATED, np.array(ISOLATED)):
+        result = hit_or_miss(_image(), template)
+        assert result.shape == (12, 16)
+        assert list(zip(*np.nonzero(result))) == [(3, 4)]
+
+
+def test_hit_or_miss_mixed_size_templates():
+    image = _image()
+    separate = hit_or_miss(image, [ISOLATED, CORNER], combine=False)
+    assert separate.shape == (2, 12, 16)
+    assert np.array_equal(separate[0], hit_or_miss(image, ISOLATED))
+    assert np.array_equal(separate[1], hit_or_miss(image, CORNER))
+    # Matches are reported at the template centre (the corner pixel is at offset (-1, -1))
+    assert list(zip(*np.nonzero(separate[1]))) == [(7, 10)]
+    union = hit_or_miss(image, [ISOLATED, CORNER])
+    assert np.array_equal(union, np.maximum(separate[0], separate[1]))
+
+
+def test_h_maxima_flat_image_has_no_maxima():
+    assert not h_maxima(np.full((10, 12), 90, dtype=np.uint8), 5).any()
+    assert not h_maxima(np.zeros((10, 12), dtype=np.uint8), 0).any()
+
+
+def test_h_maxima_image_flatter_than_h_has_no_maxima():
+    image = np.full((10, 12), 50, dtype=np.uint8)
+    image[4:6, 4:6] = 53
+    assert not h_maxima(image, 10).any()
+
+
+def test_h_maxima_keeps_peaks_higher_than_h():
+    image = np.full((10, 12), 50, dtype=np.uint8)
+    image[2:4, 2:4] = 53
+    image[6:8, 7:9] = 80
+    result = h_maxima(image, 10)
+    assert result.dtype == np.uint8
+    assert list(zip(*np.nonzero(result))) == [(6, 7), (6, 8), (7, 7), (7, 8)]
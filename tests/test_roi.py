@@ -0,0 +1,34 @@
+import numpy as np
+
+from image_processing.filtering import apply_averaging_filter
+from image_processing.gradient import gradient_magnitude
+from utils.color import to_gray
+
+
+def _image():
+    return np.random.default_rng(1).integers(0, 256, (40, 50, 3)).astype(np.uint8)
+
+
+def test_in_place_roi_edit_refreshes_gray():
+    image = _image()
+    before = to_gray(image).copy()
+    result = apply_averaging_filter(image, 5, roi=(5, 10, 30, 40), out=image)
+    assert result is image
+    assert not np.array_equal(to_gray(image), before)
+    assert np.array_equal(to_gray(image), to_gray(image.copy()))
+
+
+def test_in_place_roi_edit_refreshes_gradients():
+    image = _image()
+    gradient_magnitude(image)
+    apply_averaging_filter(image, 3, roi=(0, 0, 20, 20), out=image)
+    assert np.array_equal(gradient_magnitude(image), gradient_magnitude(image.copy()))
+
+
+def test_roi_keeps_pixels_outside_the_selection():
+    image = _image()
+    result = apply_averaging_filter(image, 5, roi=(5, 10, 30, 40))
+    full = apply_averaging_filter(image, 5)
+    assert result.shape == image.shape
+    assert np.array_equal(result[:5], image[:5])
+    assert np.array_equal(result[5:30, 10:40], np.repeat(full[5:30, 10:40, None], 3, axis=2))
@@ -0,0 +1,86 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Other Necessary Libraries
+import functools
+import numpy as np
+
+# ================================= Batch Processing ================================
+# ===================================================================================
+#
+# Operations decorated with `supports_batch` take a stack of frames
+# (N, H, W) or (N, H, W, C) with batch=True, e.g. every frame of a clip or
+# every page of a PDF, and return the stacked results (a tuple of stacks
+# for operations returning tuples). Padding applies to the spatial axes
+# only, so every frame gives the same result as a separate call.
+#
+# Vectorized operations (filters, thresholding, LoG, morphology) process
+# chunk_size frames per call as one stack; the others run frame by frame.
+# chunk_size bounds the temporaries of a vectorized call (None: all frames
+# at once).
+
+
+def chunks(count, chunk_size=None):
+    """(start, stop) ranges covering `count` frames, at most chunk_size at a time."""
+    step = max(1, int(chunk_size)) if chunk_size else max(1, count)
+    return [(start, min(start + step, count)) for start in range(0, count, step)]
+
+
+def stack_results(results):
+    """Stack per-frame results (component-wise for tuples)."""
+    if results and isinstance(results[0], tuple):
+        return tuple(np.stack(component) for component in zip(*results))
+    return np.stack(results)
+
+
+def supports_batch(vectorized=False):
+    """
+    Decorator adding `batch=` and `chunk_size=` keyword arguments to an image operation.
+
+    Args:
+        vectorized (bool): The operation takes `batch=True` itself and
+            processes a stack of frames in one call; otherwise it is run
+            frame by frame
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(image, *args, batch=False, chunk_size=None, **kwargs):
+            if not batch:
+                return function(image, *args, **kwargs)
+            image = np.asarray(image)
+            out = kwargs.pop('out', None)
+
+            # Regions of interest are per frame, so they always run frame by frame
+            frame_wise = not vectorized or kwargs.get('roi') is not None or kwargs.get('mask') is not None
+            if frame_wise:
+                results = [function(frame, *args, **kwargs) for frame in image]
+                if out is None:
+                    return stack_results(results)
+                for index, result in enumerate(results):
+                    out[index] = result
+                return out
+
+            parts = []
+            for start, stop in chunks(image.shape[0], chunk_size):
+                if out is not None:
+                    kwargs['out'] = out[start:stop]
+                parts.append(function(image[start:stop], *args, batch=True, **kwargs))
+            if out is not None:
+                return out
+            return parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return wrapper
+    return decorator
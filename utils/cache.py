@@ -0,0 +1,96 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Other Necessary Libraries
+from collections import OrderedDict
+import numpy as np
+import threading
+import weakref
+import zlib
+
+# ================================= Per-Buffer Cache ================================
+# ===================================================================================
+#
+# Derived images (grayscale, gradients, ...) memoized per source buffer, so
+# chained operations on the same image compute them once. Entries are keyed
+# by the identity of the array object (checked through a weak reference, so
+# a recycled id never hits a stale entry), its data pointer, shape, strides,
+# a version counter and a CRC-32 of its contents. The checksum (a fraction
+# of the cost of the cheapest cached conversion) catches edits made in
+# place, through the array or any view of it, without the editor's help;
+# `mark_modified` invalidates an array's entries explicitly.
+
+CACHE_SIZE = 16
+_cache = OrderedDict()
+_versions = {}
+_lock = threading.Lock()
+
+
+def _version(image):
+    """Current version of an array (0 until it is first marked modified)."""
+    entry = _versions.get(id(image))
+    if entry is None or entry[0]() is not image:
+        return 0
+    return entry[1]
+
+
+def _fingerprint(image):
+    """CRC-32 of an array's contents (non-contiguous arrays are copied first)."""
+    return zlib.crc32(np.ascontiguousarray(image).view(np.uint8).reshape(-1))
+
+
+def mark_modified(image):
+    """Bump the version of an array modified in place, invalidating what was derived from it."""
+    with _lock:
+        version = _version(image) + 1
+        key = id(image)
+        _versions[key] = (weakref.ref(image, lambda _, key=key: _versions.pop(key, None)), version)
+
+
+def memoize(image, key, compute):
+    """
+    Return compute() memoized for this image buffer and key.
+
+    Args:
+        image: Source array
+        key: Hashable description of the derived result (operation and parameters)
+        compute: Zero-argument function producing the result
+
+    Returns:
+        The cached or freshly computed result
+    """
+    interface = image.__array_interface__
+    fingerprint = _fingerprint(image)
+    with _lock:
+        cache_key = (id(image), interface['data'][0], image.shape, image.strides, _version(image), fingerprint, key)
+        entry = _cache.get(cache_key)
+        if entry is not None and entry[0]() is image:
+            _cache.move_to_end(cache_key)
+            return entry[1]
+
+    result = compute()
+    with _lock:
+        _cache[cache_key] = (weakref.ref(image), result)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    """Drop every memoized result."""
+    with _lock:
+        _cache.clear()
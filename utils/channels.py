@@ -0,0 +1,127 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Grayscale Conversion
+from utils.color import to_gray
+
+# Other Necessary Libraries
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import numpy as np
+import os
+
+# ================================ Colour Channels ==================================
+# ===================================================================================
+#
+# Operations decorated with `supports_channels` collapse colour images to
+# grayscale by default, as before. With per_channel=True an (H, W, C)
+# image is processed as a (C, H, W) stack of planes in one vectorized pass
+# and the result keeps its channels; the result is the same as calling the
+# operation on every channel separately. threads=True runs the channels as
+# separate 2-D calls on a pool of worker threads instead (NumPy releases
+# the GIL in its loops, and each worker keeps its own workspace).
+#
+# With batch=True (see utils.batch) the first axis is a stack of frames,
+# (N, H, W) or (N, H, W, C), and the planes are (N, H, W) or (N, C, H, W).
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _pool
+
+
+def keeps_channels(image, per_channel=False, batch=False):
+    """True when an operation processes the image's colour channels separately."""
+    return per_channel and np.ndim(image) - bool(batch) == 3
+
+
+def to_planes(image, dtype, per_channel=False, batch=False):
+    """
+    Planes an operation works on: the grayscale image, or a (C, H, W) view of the channels.
+
+    Args:
+        image: Input image
+        dtype: Working dtype of the operation
+        per_channel (bool): Keep the colour channels
+        batch (bool): The first axis is a stack of frames
+
+    Returns:
+        numpy.ndarray with the spatial axes last
+    """
+    if keeps_channels(image, per_channel, batch):
+        return np.moveaxis(np.asarray(image).astype(dtype, copy=False), -1, int(bool(batch)))
+    return to_gray(image, dtype, colour=np.ndim(image) - bool(batch) == 3)
+
+
+def from_planes(planes, image, per_channel=False, out=None, batch=False):
+    """
+    Result of `to_planes` planes back in the image's layout (channels last, contiguous).
+
+    Args:
+        planes: Result computed on the planes
+        image: Input image the planes came from
+        per_channel (bool): Whether the planes are colour channels
+        out: Optional output buffer in the image's layout
+        batch (bool): The first axis is a stack of frames
+
+    Returns:
+        numpy.ndarray
+    """
+    if keeps_channels(image, per_channel, batch):
+        planes = np.moveaxis(planes, int(bool(batch)), -1)
+        if out is None:
+            return np.ascontiguousarray(planes)
+    if out is None or out is planes:
+        return planes
+    out[...] = planes
+    return out
+
+
+def map_channels(function, image, *args, out=None, **kwargs):
+    """
+    Run a 2-D operation on every channel of an (H, W, C) image on separate threads.
+
+    Returns:
+        Channel-last result
+    """
+    kwargs.pop('workspace', None)  # a workspace must not be shared between threads
+    planes = [image[..., c] for c in range(image.shape[-1])]
+    results = list(_get_pool().map(lambda plane: function(plane, *args, **kwargs), planes))
+    if out is None:
+        out = np.empty(results[0].shape + (len(results),), dtype=results[0].dtype)
+    for c, result in enumerate(results):
+        out[..., c] = result
+    return out
+
+
+def supports_channels(function):
+    """
+    Decorator adding `per_channel=` and `threads=` keyword arguments to an image operation.
+
+    The operation itself takes `per_channel` and handles the (C, H, W) stack
+    (see to_planes / from_planes); the decorator dispatches the threaded case.
+    """
+    @functools.wraps(function)
+    def wrapper(image, *args, per_channel=False, threads=False, **kwargs):
+        if threads and keeps_channels(image, per_channel, kwargs.get('batch', False)):
+            return map_channels(function, np.asarray(image), *args, **kwargs)
+        return function(image, *args, per_channel=per_channel, **kwargs)
+    return wrapper
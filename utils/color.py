@@ -0,0 +1,386 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Per-Buffer Cache
+from utils.cache import memoize
+# Working Precision
+from utils.precision import WORKING_DTYPE
+from utils.precision import is_float
+
+# Other Necessary Libraries
+import numpy as np
+
+# ================================ Colour Conversion ================================
+# ===================================================================================
+#
+# All conversions work on uint8 RGB images with integer fixed-point arithmetic
+# (coefficients scaled by 2^SHIFT, rounded, then shifted back), write into an
+# optional `out` buffer and never modify their input. 8-bit layouts follow
+# OpenCV: YCbCr / YUV chroma offset by 128, HSV hue in [0, 180), Lab with
+# L scaled to [0, 255] and a, b offset by 128.
+
+SHIFT = 16
+HALF = 1 << (SHIFT - 1)
+
+
+def _fixed(matrix, shift=SHIFT):
+    """Round a float matrix to fixed point."""
+    return np.rint(np.asarray(matrix) * (1 << shift)).astype(np.int64)
+
+
+def _output(image, out, channels=3):
+    """Allocate (or check) the uint8 output buffer."""
+    shape = image.shape[:2] + ((channels,) if channels > 1 else ())
+    if out is None:
+        return np.empty(shape, dtype=np.uint8)
+    if out.shape != shape or out.dtype != np.uint8:
+        raise ValueError("out must be a uint8 array of shape {}".format(shape))
+    return out
+
+
+def _planes(image):
+    """The three channels of an image as int32 planes (copies; the input is left untouched)."""
+    image = np.asarray(image)
+    return [image[..., c].astype(np.int32) for c in range(3)]
+
+
+def _store(out, planes):
+    """Clip int planes to [0, 255] and store them in a uint8 buffer."""
+    for c, plane in enumerate(planes):
+        np.clip(plane, 0, 255, out=plane)
+        out[..., c] = plane
+    return out
+
+
+def _matrix_convert(image, matrix, offsets, out, pre_offsets=(0, 0, 0)):
+    """out = matrix @ (pixel - pre_offsets) + offsets, in fixed point."""
+    coefficients = _fixed(matrix)
+    planes = _planes(image)
+    for plane, pre in zip(planes, pre_offsets):
+        if pre:
+            plane -= pre
+    out = _output(image, out)
+    result = []
+    for row, offset in zip(coefficients, offsets):
+        acc = np.full(planes[0].shape, HALF + (offset << SHIFT), dtype=np.int64)
+        for coefficient, plane in zip(row, planes):
+            if coefficient:
+                acc += coefficient * plane
+        result.append(acc >> SHIFT)
+    return _store(out, result)
+
+
+########################################################## YCbCr (BT.601 full range, JPEG)
+YCBCR_FROM_RGB = [[0.299, 0.587, 0.114],
+                  [-0.168736, -0.331264, 0.5],
+                  [0.5, -0.418688, -0.081312]]
+RGB_FROM_YCBCR = [[1.0, 0.0, 1.402],
+                  [1.0, -0.344136, -0.714136],
+                  [1.0, 1.772, 0.0]]
+
+
+def rgb_to_ycbcr(image, out=None):
+    """RGB to full-range YCbCr (chroma offset by 128)."""
+    return _matrix_convert(image, YCBCR_FROM_RGB, (0, 128, 128), out)
+
+
+def ycbcr_to_rgb(image, out=None):
+    """Full-range YCbCr to RGB."""
+    return _matrix_convert(image, RGB_FROM_YCBCR, (0, 0, 0), out, pre_offsets=(0, 128, 128))
+
+
+########################################################## YUV (analog BT.601)
+YUV_FROM_RGB = [[0.299, 0.587, 0.114],
+                [-0.14713, -0.28886, 0.436],
+                [0.615, -0.51499, -0.10001]]
+RGB_FROM_YUV = [[1.0, 0.0, 1.13983],
+                [1.0, -0.39465, -0.58060],
+                [1.0, 2.03211, 0.0]]
+
+
+def rgb_to_yuv(image, out=None):
+    """RGB to YUV (chroma offset by 128 and clipped to 8 bits)."""
+    return _matrix_convert(image, YUV_FROM_RGB, (0, 128, 128), out)
+
+
+def yuv_to_rgb(image, out=None):
+    """YUV (chroma offset by 128) to RGB."""
+    return _matrix_convert(image, RGB_FROM_YUV, (0, 0, 0), out, pre_offsets=(0, 128, 128))
+
+
+########################################################## Luma plane
+LUMA_WEIGHTS = _fixed(YCBCR_FROM_RGB[0])
+
+
+def rgb_to_luma(image, out=None):
+    """Y plane (BT.601) of an RGB image as uint8, without computing chroma."""
+    planes = _planes(image)
+    acc = np.full(planes[0].shape, HALF, dtype=np.int64)
+    for weight, plane in zip(LUMA_WEIGHTS, planes):
+        acc += weight * plane
+    out = _output(image, out, channels=1)
+    out[...] = acc >> SHIFT
+    return out
+
+
+def replace_luma(image, luma, old_luma=None, out=None):
+    """
+    Reinsert a modified Y plane into an RGB image.
+
+    In YCbCr every RGB channel depends on Y with coefficient 1, so changing
+    the luma by dY while keeping the chroma is exactly adding dY to R, G and
+    B: no chroma conversion is needed in either direction.
+    """
+    if old_luma is None:
+        old_luma = rgb_to_luma(image)
+    delta = np.rint(np.asarray(luma, dtype=np.float64)).astype(np.int32) - old_luma
+    out = _output(image, out)
+    return _store(out, [plane + delta for plane in _planes(image)])
+
+
+def apply_to_luma(image, function, out=None):
+    """
+    Run a single-channel operation on the luma of an RGB image (chroma untouched).
+
+    Float (working-precision) images are processed in float32 without
+    rounding or clipping; `out` applies to uint8 images only.
+    """
+    if is_float(image):
+        image = np.asarray(image, dtype=WORKING_DTYPE)
+        luma = np.dot(image[..., :3], np.asarray(YCBCR_FROM_RGB[0], dtype=WORKING_DTYPE))
+        delta = np.asarray(function(luma), dtype=WORKING_DTYPE) - luma
+        return image[..., :3] + delta[..., None]
+    luma = rgb_to_luma(image)
+    return replace_luma(image, function(luma), luma, out)
+
+
+########################################################## Grayscale
+# The app's historical weights (0.2989, 0.5870, 0.1140) are exact in units of
+# 1/10000, so the integer sum truncated by GRAY_SCALE is the exact value of
+# the float conversion np.dot(image, weights).astype(np.uint8). The two only
+# differ where the weighted sum is a whole grey level (about 2 in 100000 of
+# all RGB values): rounding error can put the float sum just below it, and
+# whether it does depends on the pixel's position in the array.
+GRAY_WEIGHTS = np.array([2989, 5870, 1140], dtype=np.uint32)
+GRAY_SCALE = 10000
+
+
+def to_gray(image, dtype=np.uint8, colour=None):
+    """
+    Grayscale of an RGB or grayscale image.
+
+    uint8 results use exact integer arithmetic (see GRAY_WEIGHTS); float32
+    results (working precision, see utils.precision) are not rounded.
+    Conversions of colour images are memoized per source buffer (see
+    utils.cache), so chained operations on the same image convert once; the
+    cached result is read-only. An input that already has the requested
+    dtype and one channel is returned as is.
+
+    Args:
+        image: Input image (RGB or grayscale)
+        dtype: np.uint8 or np.float32
+        colour (bool): Whether the last axis holds colour channels; by default
+            3-D images are colour (pass it for stacks of frames)
+
+    Returns:
+        Grayscale image
+    """
+    image = np.asarray(image)
+    dtype = np.dtype(dtype)
+    if colour is None:
+        colour = image.ndim == 3
+    if not colour or image.shape[-1] < 3:
+        return image if image.dtype == dtype else image.astype(dtype)
+
+    def compute():
+        source = image[..., :3]
+        if dtype != np.uint8:
+            gray = np.dot(source.astype(dtype, copy=False), np.array([0.2989, 0.5870, 0.1140], dtype=dtype))
+        elif source.dtype != np.uint8:
+            # Float or wide inputs keep the original floating-point conversion
+            gray = np.dot(source, [0.2989, 0.5870, 0.1140]).astype(np.uint8)
+        else:
+            acc = np.multiply(source[..., 0], GRAY_WEIGHTS[0], dtype=np.uint32)
+            acc += np.multiply(source[..., 1], GRAY_WEIGHTS[1], dtype=np.uint32)
+            acc += np.multiply(source[..., 2], GRAY_WEIGHTS[2], dtype=np.uint32)
+            acc //= GRAY_SCALE
+            gray = acc.astype(np.uint8)
+        gray.flags.writeable = False
+        return gray
+
+    return memoize(image, ('gray', dtype.str), compute)
+
+
+########################################################## HSV (8-bit, hue in [0, 180))
+HSV_SHIFT = 12
+_HUE_DIVISION = np.concatenate([[0], np.rint(30 * (1 << HSV_SHIFT) / np.arange(1, 256))]).astype(np.int64)
+_SAT_DIVISION = np.concatenate([[0], np.rint(255 * (1 << HSV_SHIFT) / np.arange(1, 256))]).astype(np.int64)
+
+
+def rgb_to_hsv(image, out=None):
+    """RGB to 8-bit HSV with reciprocal tables instead of divisions (same tables as OpenCV)."""
+    r, g, b = _planes(image)
+    value = np.maximum(np.maximum(r, g), b)
+    diff = value - np.minimum(np.minimum(r, g), b)
+    half = 1 << (HSV_SHIFT - 1)
+
+    saturation = (diff * _SAT_DIVISION[value] + half) >> HSV_SHIFT
+
+    # Hue numerator per dominant channel: sector offset of 0, 2 or 4 times diff
+    numerator = np.where(value == r, g - b, np.where(value == g, b - r + 2 * diff, r - g + 4 * diff))
+    hue = (numerator * _HUE_DIVISION[diff] + half) >> HSV_SHIFT
+    hue[hue < 0] += 180
+
+    out = _output(image, out)
+    return _store(out, [hue, saturation, value])
+
+
+def hsv_to_rgb(image, out=None):
+    """8-bit HSV to RGB in fixed point."""
+    hue, saturation, value = _planes(image)
+    hue = hue % 180
+    sector = hue // 30
+    fraction = hue - 30 * sector                               # 0..29, in 30ths
+
+    # p, q, t = V (1 - S), V (1 - S f), V (1 - S (1 - f)) with S in 255ths and f in 30ths
+    p = (value * (255 - saturation) + 127) // 255
+    q = (value * (255 * 30 - saturation * fraction) + 3825) // 7650
+    t = (value * (255 * 30 - saturation * (30 - fraction)) + 3825) // 7650
+
+    choices_r = [value, q, p, p, t, value]
+    choices_g = [t, value, value, q, p, p]
+    choices_b = [p, p, t, value, value, q]
+    out = _output(image, out)
+    return _store(out, [np.choose(sector, choices_r), np.choose(sector, choices_g), np.choose(sector, choices_b)])
+
+
+def replace_value(image, value, old_value=None, out=None):
+    """
+    Reinsert a modified V plane into an RGB image.
+
+    Scaling R, G and B by V' / V keeps hue and saturation, so no HSV round trip is needed.
+    """
+    planes = _planes(image)
+    if old_value is None:
+        old_value = np.maximum(np.maximum(planes[0], planes[1]), planes[2])
+    value = np.rint(np.asarray(value, dtype=np.float64)).astype(np.int64)
+    scale = (value << SHIFT) // np.maximum(old_value, 1)
+    black = old_value == 0
+    out = _output(image, out)
+    return _store(out, [np.where(black, value, (plane * scale + HALF) >> SHIFT) for plane in planes])
+
+
+def apply_to_value(image, function, out=None):
+    """
+    Run a single-channel operation on the HSV value (max channel) of an RGB image.
+
+    Float (working-precision) images are processed in float32 without
+    rounding or clipping; `out` applies to uint8 images only.
+    """
+    image = np.asarray(image)
+    if is_float(image):
+        image = image[..., :3].astype(WORKING_DTYPE, copy=False)
+        old_value = image.max(axis=2)
+        value = np.asarray(function(old_value), dtype=WORKING_DTYPE)
+        black = old_value <= 0
+        scale = np.where(black, 0, value / np.where(black, 1, old_value))
+        return np.where(black[..., None], value[..., None], image * scale[..., None]).astype(WORKING_DTYPE)
+    old_value = image[..., :3].max(axis=2)
+    return replace_value(image, function(old_value), old_value.astype(np.int64), out)
+
+
+########################################################## CIE Lab (D65, 8-bit)
+LAB_SHIFT = 12
+_LAB_ONE = 1 << LAB_SHIFT
+XYZ_FROM_RGB = [[0.412453, 0.357580, 0.180423],
+                [0.212671, 0.715160, 0.072169],
+                [0.019334, 0.119193, 0.950227]]
+RGB_FROM_XYZ = [[3.240479, -1.53715, -0.498535],
+                [-0.969256, 1.875991, 0.041556],
+                [0.055648, -0.204043, 1.057311]]
+WHITE_D65 = [0.950456, 1.0, 1.088754]
+
+
+def _srgb_to_linear(c):
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+
+def _linear_to_srgb(c):
+    return np.where(c <= 0.0031308, 12.92 * c, 1.055 * np.power(np.maximum(c, 0), 1 / 2.4) - 0.055)
+
+
+def _lab_f(t):
+    return np.where(t > 0.008856, np.cbrt(t), 7.787 * t + 16 / 116)
+
+
+# Tables: 8-bit sRGB -> linear, linear -> 8-bit sRGB, and f(t), all in LAB_SHIFT fixed point
+_LINEAR_TABLE = np.rint(_srgb_to_linear(np.arange(256) / 255) * _LAB_ONE).astype(np.int64)
+_LAB_F_RANGE = 2 * _LAB_ONE
+_LAB_F_TABLE = np.rint(_lab_f(np.arange(_LAB_F_RANGE + 1) / _LAB_ONE) * _LAB_ONE).astype(np.int64)
+
+# The inverse amplifies rounding (cube, then a matrix with gains above 3), so it runs at a finer scale
+LAB_INVERSE_SHIFT = 16
+_LAB_INVERSE_ONE = 1 << LAB_INVERSE_SHIFT
+_GAMMA_TABLE = np.clip(np.rint(_linear_to_srgb(np.arange(_LAB_INVERSE_ONE + 1) / _LAB_INVERSE_ONE) * 255),
+                       0, 255).astype(np.uint8)
+
+
+def rgb_to_lab(image, out=None):
+    """RGB to 8-bit Lab: table gamma, fixed-point XYZ matrix, table cube root."""
+    linear = [_LINEAR_TABLE[plane] for plane in _planes(image)]
+    # White point folded into the matrix rows so f() takes X / Xn directly
+    coefficients = _fixed(np.asarray(XYZ_FROM_RGB) / np.asarray(WHITE_D65)[:, None], LAB_SHIFT)
+    f = []
+    for row in coefficients:
+        xyz = (row[0] * linear[0] + row[1] * linear[1] + row[2] * linear[2] + (_LAB_ONE >> 1)) >> LAB_SHIFT
+        f.append(_LAB_F_TABLE[np.clip(xyz, 0, _LAB_F_RANGE)])
+    fx, fy, fz = f
+
+    half = _LAB_ONE >> 1
+    lightness = (116 * fy - 16 * _LAB_ONE) * 255 // 100
+    lightness = (lightness + half) >> LAB_SHIFT
+    a = ((500 * (fx - fy) + half) >> LAB_SHIFT) + 128
+    b = ((200 * (fy - fz) + half) >> LAB_SHIFT) + 128
+
+    out = _output(image, out)
+    return _store(out, [lightness, a, b])
+
+
+def lab_to_rgb(image, out=None):
+    """8-bit Lab to RGB, inverting rgb_to_lab in fixed point."""
+    one = _LAB_INVERSE_ONE
+    shift = LAB_INVERSE_SHIFT
+    lightness, a, b = [plane.astype(np.int64) for plane in _planes(image)]
+    # f(Y) from L, then f(X), f(Z) from a, b
+    fy = ((lightness * 100 + 16 * 255) * one + 116 * 255 // 2) // (116 * 255)
+    fx = fy + ((a - 128) * one + 250) // 500
+    fz = fy - ((b - 128) * one + 100) // 200
+
+    def inverse_f(f):
+        cube = (((f * f + (one >> 1)) >> shift) * f + (one >> 1)) >> shift
+        linear_part = ((f * 116 - 16 * one) * 1000 + 116 * 7787 // 2) // (116 * 7787)
+        return np.where(f > int(0.206893 * one), cube, linear_part)
+
+    xyz = [inverse_f(f) for f in (fx, fy, fz)]
+    coefficients = _fixed(np.asarray(RGB_FROM_XYZ) * np.asarray(WHITE_D65)[None, :], shift)
+    result = []
+    for row in coefficients:
+        linear = (row[0] * xyz[0] + row[1] * xyz[1] + row[2] * xyz[2] + (one >> 1)) >> shift
+        result.append(_GAMMA_TABLE[np.clip(linear, 0, one)])
+
+    out = _output(image, out)
+    return _store(out, result)
@@ -0,0 +1,63 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Other Necessary Libraries
+import numpy as np
+
+# ================================ Working Precision ================================
+# ===================================================================================
+#
+# Operations follow the dtype of their input: uint8 images give uint8
+# results (quantized as before), float images give float32 results on the
+# same 0..255 scale, neither rounded nor clipped, so a chain of operations
+# is quantized once, at display or save time.
+
+WORKING_DTYPE = np.float32
+
+
+def is_float(image):
+    """True for floating-point (working-precision) images."""
+    return np.issubdtype(np.asarray(image).dtype, np.floating)
+
+
+def working_dtype(image):
+    """Result dtype of an operation on `image`: float32 for float input, uint8 otherwise."""
+    return WORKING_DTYPE if is_float(image) else np.uint8
+
+
+def to_working(image):
+    """float32 copy of an image on the 0..255 scale."""
+    return np.array(image, dtype=WORKING_DTYPE)
+
+
+def quantize(image, out=None):
+    """
+    uint8 version of an image for display or saving (rounded and clipped once).
+
+    uint8 images are returned as is.
+    """
+    image = np.asarray(image)
+    if image.dtype == np.uint8:
+        return image
+    if not is_float(image):
+        return np.clip(image, 0, 255, out=out).astype(np.uint8)
+    if out is None:
+        out = np.empty(image.shape, dtype=np.uint8)
+    rounded = np.rint(image)
+    np.clip(rounded, 0, 255, out=rounded)
+    out[...] = rounded
+    return out
@@ -0,0 +1,196 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Memo Cache
+from utils.cache import mark_modified
+
+# Other Necessary Libraries
+import functools
+import numpy as np
+
+# ================================ Region of Interest ===============================
+# ===================================================================================
+#
+# Operations decorated with `supports_roi` take two extra keyword arguments:
+#
+#   roi=(top, left, bottom, right)   rectangle in pixels (bottom / right exclusive)
+#   mask=array                       nonzero pixels are processed (e.g. a segment_image result)
+#
+# Only the bounding box of the ROI (and mask) grown by the operation's halo
+# is processed; the result is composited back into the rest of the image,
+# which is passed through unchanged, in the input's layout (a grayscale
+# result of a colour image fills every channel of the selected pixels; pass
+# out=image to process in place). Operations that use image statistics
+# (Otsu, histogram equalization, clustering, ...) compute them over the
+# bounding box.
+
+
+def roi_bounds(shape, roi=None, mask=None):
+    """
+    Bounding box (top, left, bottom, right) of an ROI rectangle and/or mask, clipped to the image.
+
+    Args:
+        shape: Image shape
+        roi: (top, left, bottom, right) or None
+        mask: Array of the image's height and width, nonzero = selected, or None
+
+    Returns:
+        tuple, or None when the selection is empty
+    """
+    height, width = shape[:2]
+    top, left, bottom, right = 0, 0, height, width
+    if roi is not None:
+        top, left = max(top, int(roi[0])), max(left, int(roi[1]))
+        bottom, right = min(bottom, int(roi[2])), min(right, int(roi[3]))
+    if mask is not None:
+        rows = np.flatnonzero(mask[top:bottom, left:right].any(axis=1))
+        cols = np.flatnonzero(mask[top:bottom, left:right].any(axis=0))
+        if not rows.size:
+            return None
+        top, bottom = top + rows[0], top + rows[-1] + 1
+        left, right = left + cols[0], left + cols[-1] + 1
+    if bottom <= top or right <= left:
+        return None
+    return top, left, bottom, right
+
+
+def _selection_mask(mask, shape):
+    """Boolean (height, width) version of a user mask (colour masks: any channel)."""
+    mask = np.asarray(mask)
+    if mask.ndim == 3:
+        mask = mask.any(axis=2)
+    mask = mask != 0
+    if mask.shape != tuple(shape[:2]):
+        raise ValueError("mask must have the image's height and width.")
+    return mask
+
+
+def _fill(target, pixels):
+    """Copy unprocessed pixels into the output layout (grayscale pixels fill every channel)."""
+    if target.ndim > pixels.ndim:
+        pixels = pixels[..., None]
+    elif target.ndim == 3 and pixels.shape[2] != target.shape[2]:
+        if pixels.shape[2] < target.shape[2]:
+            target[...] = 0
+            return
+        pixels = pixels[..., :target.shape[2]]
+    target[...] = pixels
+
+
+def process_roi(function, image, *args, roi=None, mask=None, halo=0, out=None, **kwargs):
+    """
+    Run `function(image, *args, **kwargs)` on an ROI only and composite the result back.
+
+    The result is written into one full-size output in the input's layout
+    (the caller's `out` if given; `out=image` processes in place) holding
+    the unprocessed pixels elsewhere. A grayscale result of a colour image
+    fills every channel of the selected pixels, so the rest of the image
+    keeps its colours; a colour result of a grayscale image gets the gray
+    values in every channel outside the selection.
+
+    Args:
+        function: Image operation
+        image: Input image
+        roi: (top, left, bottom, right) or None
+        mask: Selection mask or None
+        halo (int): Context pixels the operation needs around each output pixel
+        out: Optional output buffer (the full-size result's shape)
+
+    Returns:
+        Full-size result
+    """
+    if roi is None and mask is None:
+        return function(image, *args, out=out, **kwargs) if out is not None else function(image, *args, **kwargs)
+
+    image = np.asarray(image)
+    if mask is not None:
+        mask = _selection_mask(mask, image.shape)
+    bounds = roi_bounds(image.shape, roi, mask)
+    height, width = image.shape[:2]
+    if bounds is None:
+        # Nothing selected: nothing to process
+        if out is None:
+            return image.copy()
+        if out is not image:
+            _fill(out, image)
+            mark_modified(out)
+        return out
+    top, left, bottom, right = bounds
+
+    # Bounding box grown by the halo (the function pads at the true image border itself)
+    grown_top, grown_left = max(0, top - halo), max(0, left - halo)
+    grown_bottom, grown_right = min(height, bottom + halo), min(width, right + halo)
+    result = np.asarray(function(image[grown_top:grown_bottom, grown_left:grown_right], *args, **kwargs))
+
+    # 'Valid'-size operations (e.g. LoG) shrink their input by (shrink_h, shrink_w), even
+    # kernels may grow it (negative shrink), and output pixel (y, x) belongs to input
+    # pixel (y + offset_h, x + offset_w)
+    shrink_h = (grown_bottom - grown_top) - result.shape[0]
+    shrink_w = (grown_right - grown_left) - result.shape[1]
+    offset_h, offset_w = shrink_h // 2, shrink_w // 2
+    channels = image.shape[2:] if result.ndim == 2 or result.shape[2:] == image.shape[2:] else result.shape[2:]
+    shape = (height - shrink_h, width - shrink_w) + channels
+    if out is None:
+        out = np.empty(shape, dtype=result.dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out must have shape {shape}.")
+
+    # Unprocessed pixels, straight from the image (zeros where a grown output has no input pixel)
+    rows = slice(max(0, -offset_h), min(shape[0], height - offset_h))
+    cols = slice(max(0, -offset_w), min(shape[1], width - offset_w))
+    if out is not image:
+        if (rows.stop - rows.start, cols.stop - cols.start) != shape[:2]:
+            out[...] = 0
+        _fill(out[rows, cols], image[rows.start + offset_h:rows.stop + offset_h,
+                                     cols.start + offset_w:cols.stop + offset_w])
+
+    # Selected output rows / columns, and where they are in the result
+    out_top, out_bottom = max(top - offset_h, grown_top), min(bottom - offset_h, grown_top + result.shape[0])
+    out_left, out_right = max(left - offset_w, grown_left), min(right - offset_w, grown_left + result.shape[1])
+    if out_bottom <= out_top or out_right <= out_left:
+        return out
+    source = result[out_top - grown_top:out_bottom - grown_top, out_left - grown_left:out_right - grown_left]
+    if source.ndim < out.ndim:
+        source = source[..., None]
+    target = out[out_top:out_bottom, out_left:out_right]
+    if mask is None:
+        target[...] = source
+    else:
+        selected = mask[out_top + offset_h:out_bottom + offset_h, out_left + offset_w:out_right + offset_w]
+        target[selected] = source[selected]
+    # Results derived from the caller's buffer before the edit are stale now
+    mark_modified(out)
+    return out
+
+
+def supports_roi(halo=0):
+    """
+    Decorator adding `roi=` and `mask=` keyword arguments to an image operation.
+
+    Args:
+        halo: Context pixels the operation needs, as an int or as a function
+            of the operation's arguments returning one
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(image, *args, roi=None, mask=None, **kwargs):
+            if roi is None and mask is None:
+                return function(image, *args, **kwargs)
+            margin = halo(*args, **kwargs) if callable(halo) else halo
+            return process_roi(function, image, *args, roi=roi, mask=mask, halo=margin, **kwargs)
+        return wrapper
+    return decorator
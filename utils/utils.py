@@ -18,16 +18,28 @@
 # Numpy Sliding Tricks
 from numpy.lib.stride_tricks import as_strided
 
+# Colour Conversion
+from utils.color import rgb_to_yuv
+from utils.color import yuv_to_rgb
+# Working Precision
+from utils.precision import working_dtype
+# Batch Processing
+from utils.batch import chunks
+
 # Other Necessary Libraries
 import numpy as np
 
 # ==================================== Utilities ====================================
 # ===================================================================================
 
-# For Convulution
-def convolve(image, kernel):
+# For Convulution ('valid' size; leading axes, e.g. frames or colour planes, are a stack processed in one pass,
+# at most chunk_size entries of the first axis at a time to bound the window copies)
+def convolve(image, kernel, chunk_size=None):
+    if chunk_size and image.ndim > 2 and image.shape[0] > chunk_size:
+        return np.concatenate([convolve(image[start:stop], kernel) for start, stop in chunks(image.shape[0], chunk_size)])
+    
     # Get the dimensions of the image and the kernel
-    image_height, image_width = image.shape
+    image_height, image_width = image.shape[-2:]
     kernel_height, kernel_width = kernel.shape
     
     # Calculate output dimensions
@@ -38,39 +50,26 @@ def convolve(image, kernel):
     image_strides = image.strides
     
     # Calculate strides for a sliding window of the image
-    window_strides = (image_strides[0], image_strides[1], *image_strides)
+    window_strides = (image_strides[-2], image_strides[-1], *image_strides[-2:])
     
-    # Create a view of the image with shape (output_height, output_width, kernel_height, kernel_width)
-    image_view = as_strided(image, shape=(output_height, output_width, kernel_height, kernel_width),
-                            strides=(window_strides[0], window_strides[1], *image_strides))
+    # Create a view of the image with shape (..., output_height, output_width, kernel_height, kernel_width)
+    image_view = as_strided(image, shape=(*image.shape[:-2], output_height, output_width, kernel_height, kernel_width),
+                            strides=(*image_strides[:-2], *window_strides))
     
     # Perform element-wise multiplication between the image view and the kernel
-    convolved = np.tensordot(image_view, kernel, axes=((2,3), (0,1)))
+    convolved = np.tensordot(image_view, kernel, axes=((-2, -1), (0, 1)))
     
-    return convolved.astype(np.uint8)
+    # uint8 input is requantized, float input stays float32 (working precision)
+    return convolved.astype(working_dtype(image))
 
 
-# Convert BGR to YUV using numpy
-def bgr_to_yuv(image):
-    image = np.array(image)
-    # Conversion matrix from BGR to YUV
-    conversion_matrix = np.array([[0.299, 0.587, 0.114],
-                                  [-0.14713, -0.28886, 0.436],
-                                  [0.615, -0.51499, -0.10001]])
-    yuv_image = np.dot(image.astype(np.float32), conversion_matrix.T)
-    yuv_image[:, :, 1:] += 128  # Shift chrominance values
-    return yuv_image.astype(np.uint8)
+# Convert BGR to YUV (fixed point, see utils.color; the input is not modified)
+def bgr_to_yuv(image, out=None):
+    return rgb_to_yuv(image, out)
 
-# Convert YUV to BGR using numpy
-def yuv_to_bgr(image):
-    image = np.array(image)
-    # Conversion matrix from YUV to BGR
-    conversion_matrix = np.array([[1.0, 0.0, 1.13983],
-                                  [1.0, -0.39465, -0.58060],
-                                  [1.0, 2.03211, 0.0]])
-    image[:, :, 1:] -= 128  # Shift chrominance values
-    bgr_image = np.dot(image.astype(np.float32), conversion_matrix.T)
-    return np.clip(bgr_image, 0, 255).astype(np.uint8)
+# Convert YUV to BGR (fixed point, see utils.color; the input is not modified)
+def yuv_to_bgr(image, out=None):
+    return yuv_to_rgb(image, out)
 
 # Function to convert rgb image to graysacle (taken from the internet)
 def rgb_to_gray(image):
@@ -0,0 +1,183 @@
+# Copyright 2025 Ahmed Kamal
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# ================================== All Libraries ==================================
+# ===================================================================================
+
+# Other Necessary Libraries
+from collections import OrderedDict
+import numpy as np
+import threading
+
+# ==================================== Workspace ====================================
+# ===================================================================================
+#
+# A pool of scratch buffers keyed by (shape, dtype, slot). Operations borrow
+# their padded copies and temporaries from it instead of allocating fresh
+# arrays on every call, so video and batch loops reuse the same memory.
+# A borrowed buffer stays valid until the next borrow of the same key on the
+# same workspace; operations must never return one to their caller.
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class Workspace:
+    """
+    Bounded pool of reusable scratch buffers, least recently used released first.
+
+    Args:
+        max_bytes (int): Total size kept in the pool; older buffers are
+            released once it is exceeded
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._buffers = OrderedDict()
+
+    def borrow(self, shape, dtype, slot=0):
+        """
+        Uninitialized buffer of the given shape and dtype.
+
+        Args:
+            shape (tuple): Buffer shape
+            dtype: Buffer dtype
+            slot: Distinguishes several buffers of the same shape and dtype
+                needed at the same time
+
+        Returns:
+            numpy.ndarray (contents undefined)
+        """
+        key = (tuple(shape), np.dtype(dtype), slot)
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            self._buffers.move_to_end(key)
+            return buffer
+
+        buffer = np.empty(key[0], dtype=key[1])
+        self._buffers[key] = buffer
+        self.nbytes += buffer.nbytes
+        # Release least recently used buffers, never the one just handed out
+        while self.nbytes > self.max_bytes and len(self._buffers) > 1:
+            _, released = self._buffers.popitem(last=False)
+            self.nbytes -= released.nbytes
+        return buffer
+
+    def zeros(self, shape, dtype, slot=0):
+        """Borrowed buffer filled with zeros."""
+        buffer = self.borrow(shape, dtype, slot)
+        buffer.fill(0)
+        return buffer
+
+    def pad(self, image, pad_h, pad_w=None, mode='constant', value=0, slot='pad'):
+        """
+        Padded copy of an image in a borrowed buffer (same result as np.pad).
+
+        The interior is copied once and the borders are written in place.
+        Only the last two (spatial) axes are padded, so a stack of planes
+        (..., height, width) is padded in one pass.
+
+        Args:
+            image: Input image, spatial axes last
+            pad_h (int): Rows added above and below
+            pad_w (int): Columns added left and right (defaults to pad_h)
+            mode (str): 'constant', 'edge' or 'reflect'
+            value: Border value for 'constant'
+            slot: Buffer slot (see borrow)
+
+        Returns:
+            Padded image (borrowed)
+        """
+        pad_w = pad_h if pad_w is None else pad_w
+        height, width = image.shape[-2:]
+        padded = self.borrow(image.shape[:-2] + (height + 2 * pad_h, width + 2 * pad_w), image.dtype, slot)
+        padded[..., pad_h:pad_h + height, pad_w:pad_w + width] = image
+
+        if mode == 'constant':
+            padded[..., :pad_h, :] = value
+            padded[..., pad_h + height:, :] = value
+            padded[..., :pad_w] = value
+            padded[..., pad_w + width:] = value
+            return padded
+
+        if mode == 'edge':
+            top, bottom = [pad_h] * pad_h, [pad_h + height - 1] * pad_h
+            left, right = [pad_w] * pad_w, [pad_w + width - 1] * pad_w
+        elif mode == 'reflect':
+            if (pad_h and pad_h >= height) or (pad_w and pad_w >= width):
+                raise ValueError("Reflect padding must be smaller than the image.")
+            top = [2 * pad_h - r for r in range(pad_h)]
+            bottom = [pad_h + height - 2 - r for r in range(pad_h)]
+            left = [2 * pad_w - c for c in range(pad_w)]
+            right = [pad_w + width - 2 - c for c in range(pad_w)]
+        else:
+            raise ValueError("Invalid mode. Supported modes are: 'constant', 'edge', 'reflect'.")
+
+        # Rows first (interior columns), then columns over the full height, like np.pad
+        inner = slice(pad_w, pad_w + width)
+        for r, source in enumerate(top):
+            padded[..., r, inner] = padded[..., source, inner]
+        for r, source in enumerate(bottom):
+            padded[..., pad_h + height + r, inner] = padded[..., source, inner]
+        for c, source in enumerate(left):
+            padded[..., c] = padded[..., source]
+        for c, source in enumerate(right):
+            padded[..., pad_w + width + c] = padded[..., source]
+        return padded
+
+    def release(self):
+        """Drop every pooled buffer."""
+        self._buffers.clear()
+        self.nbytes = 0
+
+
+_local = threading.local()
+
+
+def get_workspace():
+    """The calling thread's default workspace (threads never share buffers)."""
+    workspace = getattr(_local, 'workspace', None)
+    if workspace is None:
+        workspace = _local.workspace = Workspace()
+    return workspace
+
+
+def box_sum(padded, kernel_h, kernel_w, workspace, dtype=np.int32, slot='box'):
+    """
+    Sums over every kernel_h x kernel_w window of a padded image ('valid' size).
+
+    Separable running sums on shifted slices, accumulated in borrowed buffers.
+
+    Args:
+        padded: Padded image, spatial axes last (leading axes are a stack of planes)
+        kernel_h (int), kernel_w (int): Window size
+        workspace (Workspace): Where the temporaries come from
+        dtype: Accumulator dtype
+        slot: Buffer slot prefix
+
+    Returns:
+        Window sums (borrowed)
+    """
+    lead = padded.shape[:-2]
+    rows = padded.shape[-2] - kernel_h + 1
+    cols = padded.shape[-1] - kernel_w + 1
+    vertical = workspace.borrow(lead + (rows, padded.shape[-1]), dtype, (slot, 'rows'))
+    vertical[...] = padded[..., :rows, :]
+    for i in range(1, kernel_h):
+        vertical += padded[..., i:i + rows, :]
+    total = workspace.borrow(lead + (rows, cols), dtype, (slot, 'sum'))
+    total[...] = vertical[..., :cols]
+    for j in range(1, kernel_w):
+        total += vertical[..., j:j + cols]
+    return total